@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of generate_bom() and the HTML BOM table of a 5000 line BOM.
+
+Each BOM line is shared by two connectors, and every connector has
+an additional component, which all join into one more BOM line.
+"""
+
+from common import best_time
+
+from wireviz.DataClasses import Metadata, Options, Tweak
+from wireviz.Harness import Harness
+from wireviz.wv_bom import bom_list, generate_bom
+from wireviz.wv_helper import flatten2d
+from wireviz.wv_html import bom_html_paged, bom_html_table
+
+BOM_LINES = 5000
+REPEAT = 5
+PAGE_SIZE = 100
+
+
+def build_harness(lines: int) -> Harness:
+    """Return a harness with the given number of BOM lines."""
+    harness = Harness(metadata=Metadata(), options=Options(), tweak=Tweak())
+    connector_lines = lines - 1  # one line is used by the additional components
+    for index in range(2 * connector_lines):
+        harness.add_connector(
+            f"X{index}",
+            type="Molex KK 254",
+            subtype="female",
+            pincount=4,
+            manufacturer="Molex",
+            mpn=f"22-01-{index % connector_lines:04d}",
+            additional_components=[
+                {
+                    "type": "Crimp",
+                    "qty_multiplier": "pincount",
+                    "manufacturer": "Molex",
+                    "mpn": "08500030",
+                }
+            ],
+        )
+    return harness
+
+
+def main() -> None:
+    harness = build_harness(BOM_LINES)
+    seconds, bom = best_time(lambda: generate_bom(harness), REPEAT)
+    print(f"{len(bom)} BOM lines from {len(harness.connectors)} connectors")
+    print(f"generate_bom(): {seconds * 1000:.1f} ms")
+    rows = flatten2d(bom_list(bom))
+    seconds, html = best_time(lambda: bom_html_table(rows), REPEAT)
+    print(f"bom_html_table(): {seconds * 1000:.1f} ms, {len(html) / 1024:.0f} KiB")
+    seconds, html = best_time(lambda: bom_html_paged(rows, PAGE_SIZE), REPEAT)
+    print(f"bom_html_paged(): {seconds * 1000:.1f} ms, {len(html) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of the memory retained by parsed synthetic harnesses.
+
+Measures the memory allocated by parse() that is still in use by the
+returned harness, in total and per wire, and the size of single
+connector, cable and connection objects.
+"""
+
+import copy
+import gc
+import sys
+import tracemalloc
+
+import common
+from synthetic import generate_harness
+
+import wireviz.wireviz as wv
+
+SIZES = (1000, 10000, 50000)
+
+
+def deep_sizeof(obj, seen: set) -> int:
+    """Return the size of obj and of all objects only reachable through it."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            deep_sizeof(getattr(obj, name), seen)
+            for name in obj.__slots__
+            if hasattr(obj, name)
+        )
+    return size
+
+
+def run_size(wirecount: int) -> dict:
+    data = generate_harness(wirecount)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    harness = wv.parse(copy.deepcopy(data), return_types="harness")
+    del data
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    connector = next(iter(harness.connectors.values()))
+    cable = next(iter(harness.cables.values()))
+    # objects shared with other instances, e.g. color codes, are counted once
+    seen = set()
+    return {
+        "wires": wirecount,
+        "retained_bytes": retained,
+        "bytes_per_wire": round(retained / wirecount),
+        "connector_bytes": deep_sizeof(connector, seen),
+        "cable_bytes": deep_sizeof(cable, seen),
+        "connection_bytes": deep_sizeof(cable.connections[0], seen),
+    }
+
+
+def format_cell(size: int, old) -> str:
+    """Return the size, with the change relative to the old size if any."""
+    if old:
+        return f"{size:>11}{size / old - 1:>+7.0%}"
+    return f"{size:>18}"
+
+
+def main() -> None:
+    args = common.size_parser(__doc__.splitlines()[0], SIZES).parse_args()
+    results = [run_size(wirecount) for wirecount in args.sizes]
+    columns = ("retained_bytes", "bytes_per_wire", "connector_bytes", "cable_bytes")
+    common.print_table(
+        results, columns, format_cell, 18, compare=common.read_report(args.compare)
+    )
+    if args.output:
+        common.write_report(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
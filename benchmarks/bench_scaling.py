@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of each processing stage on synthetic harnesses of growing size.
+
+Times parse(), create_graph(), generate_bom(), the Graphviz render,
+embed_svg_images() and the HTML generation separately, and writes the results
+as JSON, so the scaling curves can be compared between commits
+(see --compare).
+"""
+
+import copy
+import sys
+import tempfile
+from pathlib import Path
+
+import common
+from synthetic import generate_harness
+
+import wireviz.wireviz as wv
+from wireviz.svgembed import b64_cache, embed_svg_images
+from wireviz.wv_bom import bom_list, generate_bom
+from wireviz.wv_helper import clear_image_size_cache
+from wireviz.wv_html import generate_html_output
+from wireviz.wv_render import graphviz_version, pipe_format
+
+SIZES = (10, 100, 1000, 10000)
+REPEAT = 3
+STAGES = ("parse", "create_graph", "generate_bom", "render", "embed_svg", "html")
+PLACEHOLDER_SVG = '<svg xmlns="http://www.w3.org/2000/svg"></svg>\n'
+
+
+def clear_caches() -> None:
+    """Clear the in-process caches, so each repetition runs like a fresh process."""
+    clear_image_size_cache()
+    b64_cache.clear()
+
+
+def best_time(stage, repeat: int, setup=lambda: ()):
+    """Return common.best_time() of stage, with the caches cleared before each
+    repetition."""
+
+    def clear_and_setup() -> tuple:
+        clear_caches()
+        return setup()
+
+    return common.best_time(stage, repeat, clear_and_setup)
+
+
+def run_size(wirecount: int, repeat: int, render: bool) -> dict:
+    data = generate_harness(wirecount)
+    times = {}
+    times["parse"], harness = best_time(
+        lambda data: wv.parse(data, return_types="harness"),
+        repeat,
+        setup=lambda: (copy.deepcopy(data),),  # parse() modifies its input
+    )
+    times["create_graph"], graph = best_time(harness.create_graph, repeat)
+    times["generate_bom"], bom = best_time(lambda: generate_bom(harness), repeat)
+    if render:
+        times["render"], svg = best_time(lambda: pipe_format(graph, "svg"), repeat)
+        svg = svg.decode("utf-8")
+    else:
+        times["render"], svg = None, PLACEHOLDER_SVG
+    times["embed_svg"], svg = best_time(lambda: embed_svg_images(svg), repeat)
+    with tempfile.TemporaryDirectory() as output_dir:
+        filename = Path(output_dir) / "bench"
+        times["html"], _ = best_time(
+            lambda: generate_html_output(
+                filename, bom_list(bom), harness.metadata, harness.options, svg
+            ),
+            repeat,
+        )
+    return {
+        "wires": wirecount,
+        "connectors": len(harness.connectors),
+        "cables": len(harness.cables),
+        "bom_entries": len(bom),
+        "seconds": times,
+    }
+
+
+def format_cell(seconds, old) -> str:
+    """Return the time in ms, with the speedup relative to the old time if any."""
+    if seconds is None:
+        return f"{'-':>14}"
+    if old:
+        return f"{seconds * 1000:>7.1f}ms{old / seconds:>5.1f}x"
+    return f"{seconds * 1000:>12.1f}ms"
+
+
+def parse_args():
+    parser = common.size_parser(__doc__.splitlines()[0], SIZES)
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT)
+    parser.add_argument(
+        "--no-render", action="store_true", help="Skip the Graphviz render."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    render = not args.no_render
+    try:
+        graphviz = ".".join(str(v) for v in graphviz_version()) if render else None
+    except Exception:  # Graphviz is not installed
+        print("Graphviz not found, skipping the render stage")
+        graphviz, render = None, False
+    results = []
+    for wirecount in args.sizes:
+        results.append(run_size(wirecount, args.repeat, render))
+        print(f"{wirecount} wires done", file=sys.stderr)
+    common.print_table(
+        results,
+        STAGES,
+        format_cell,
+        14,
+        values=lambda result: result["seconds"],
+        compare=common.read_report(args.compare),
+    )
+    output = args.output or Path(f"bench_scaling-{common.git_commit()}.json")
+    common.write_report(output, results, graphviz=graphviz, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of the CLI startup time.
+
+Runs `wireviz -V` and a BOM-only build (`-f t`) in fresh interpreters,
+reports the best wall clock time against TARGET,
+and lists the slowest imports reported by `python -X importtime`.
+The startup of the interpreter itself is included in the times.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT, best_time
+
+TARGET = 0.1  # seconds
+REPEAT = 10
+TOP_IMPORTS = 10
+
+
+def run(args, importtime: bool = False) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with cached bytecode
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else [])]
+    return subprocess.run(
+        [*cmd, "-m", "wireviz.wv_cli", *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+
+def slowest_imports(args):
+    """Return (cumulative microseconds, module) of the slowest top-level imports."""
+    imports = []
+    for line in run(args, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # top-level imports, not their dependencies
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:TOP_IMPORTS]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as output_dir:
+        commands = {
+            "-V": ["-V"],
+            "-f t": ["-f", "t", "-o", output_dir, str(ROOT / "examples/demo01.yml")],
+        }
+        for name, args in commands.items():
+            seconds, _ = best_time(lambda: run(args), REPEAT)
+            status = "OK" if seconds < TARGET else f"above {TARGET * 1000:.0f} ms"
+            print(f"{name:>8}: {seconds * 1000:7.1f} ms  {status}")
+            for cumulative, module in slowest_imports(args):
+                print(f"{'':>10}{cumulative / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
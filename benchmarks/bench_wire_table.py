@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of cable node generation in Harness.create_graph().
+
+The time per wire should stay roughly constant as the wire count grows.
+"""
+
+from common import best_time
+
+from wireviz.DataClasses import Metadata, Options, Tweak
+from wireviz.Harness import Harness
+
+WIRECOUNTS = (100, 200, 400, 800, 1600, 3200)
+REPEAT = 3
+
+
+def build_harness(wirecount: int) -> Harness:
+    """Return a harness with one cable connecting all pins of two connectors."""
+    harness = Harness(metadata=Metadata(), options=Options(), tweak=Tweak())
+    pinlabels = [f"SIG{pin}" for pin in range(1, wirecount + 1)]
+    harness.add_connector("X1", pincount=wirecount, pinlabels=pinlabels)
+    harness.add_connector("X2", pincount=wirecount, pinlabels=pinlabels)
+    harness.add_cable("W1", wirecount=wirecount, color_code="DIN", shield=True)
+    for wire in range(1, wirecount + 1):
+        harness.connect("X1", wire, "W1", wire, "X2", wire)
+    harness.connect("X1", 1, "W1", "s", None, None)
+    return harness
+
+
+def main() -> None:
+    print(f"{'wires':>8} {'seconds':>10} {'us/wire':>10}")
+    for wirecount in WIRECOUNTS:
+        harness = build_harness(wirecount)
+        best, _ = best_time(harness.create_graph, REPEAT)
+        print(f"{wirecount:>8} {best:>10.4f} {best / wirecount * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
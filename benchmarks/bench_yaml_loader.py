@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of the YAML loaders on the example and tutorial files.
+
+Compares the pure Python SafeLoader, the LibYAML based CSafeLoader (if available),
+and load_yaml() with the parsed document cache enabled.
+"""
+
+import yaml
+from common import ROOT, best_time
+
+import wireviz.wireviz as wv
+
+REPEAT = 20
+
+
+def load_all(load, texts) -> None:
+    for text in texts:
+        load(text)
+
+
+def main() -> None:
+    files = sorted([*ROOT.glob("examples/*.yml"), *ROOT.glob("tutorial/*.yml")])
+    texts = [file.read_text(encoding="utf-8") for file in files]
+    print(f"{len(files)} files, {sum(len(text) for text in texts)} characters")
+
+    loaders = {"SafeLoader": lambda text: yaml.load(text, Loader=yaml.SafeLoader)}
+    if hasattr(yaml, "CSafeLoader"):
+        loaders["CSafeLoader"] = lambda text: yaml.load(text, Loader=yaml.CSafeLoader)
+    else:
+        print("CSafeLoader is not available (PyYAML built without LibYAML)")
+    wv.set_yaml_cache_size(len(texts))
+    loaders["load_yaml (cached)"] = wv.load_yaml
+
+    baseline = None
+    for name, load in loaders.items():
+        seconds, _ = best_time(lambda: load_all(load, texts), REPEAT)
+        baseline = baseline or seconds
+        print(f"{name:>20}: {seconds * 1000:8.2f} ms  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
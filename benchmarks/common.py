@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""Helpers shared by the benchmarks.
+
+Importing this module makes the wireviz package of this repository
+importable, so it must be imported before wireviz.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def best_time(
+    func: Callable, repeat: int, setup: Callable[[], tuple] = lambda: ()
+) -> Tuple[float, Any]:
+    """Return the best time of func(*setup()) and the result of its last call.
+
+    setup() is called before each repetition, and is not timed.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def git_commit() -> str:
+    """Return the short hash of the checked out commit, or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def size_parser(description: str, sizes: Iterable[int]) -> argparse.ArgumentParser:
+    """Return an argument parser with the options of the benchmarks that run
+    synthetic harnesses of several sizes and compare the results between runs."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-s", "--sizes", type=int, nargs="+", default=sizes, help="Wire counts."
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="JSON file to write the results to."
+    )
+    parser.add_argument(
+        "-c", "--compare", type=Path, help="JSON results of an earlier run."
+    )
+    return parser
+
+
+def write_report(output: Path, results: List[dict], **info) -> None:
+    """Write the results with the commit, Python version and info as JSON."""
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        **info,
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+
+def read_report(path: Optional[Path]) -> Optional[dict]:
+    """Return the report written by write_report(), or None without a path."""
+    return json.loads(path.read_text()) if path else None
+
+
+def print_table(
+    results: List[dict],
+    columns: Iterable[str],
+    format_cell: Callable[[Any, Any], str],
+    width: int,
+    values: Callable[[dict], dict] = lambda result: result,
+    compare: Optional[dict] = None,
+) -> None:
+    """Print one row per size, with the columns of values(result) of each result.
+
+    format_cell(value, old) returns the text of one cell, of the given width,
+    where old is the value of the same size in the compared report (or None).
+    """
+    previous = {r["wires"]: values(r) for r in compare["results"]} if compare else {}
+    print(f"{'wires':>8}" + "".join(f"{column:>{width}}" for column in columns))
+    for result in results:
+        old = previous.get(result["wires"], {})
+        row = f"{result['wires']:>8}"
+        for column in columns:
+            row += format_cell(values(result)[column], old.get(column))
+        print(row)
+    if compare:
+        print(f"(compared to commit {compare['commit']})")
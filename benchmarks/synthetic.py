@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Generator of synthetic harnesses of any size for the benchmarks.
+
+The harness is built from identical groups of two connectors and one cable
+or bundle connecting all their pins. Some groups also have images,
+additional components, or a third connector mated to the second one.
+"""
+
+from pathlib import Path
+from typing import Dict
+
+RESOURCES = Path(__file__).parent.parent / "examples" / "resources"
+CONNECTOR_IMAGE = RESOURCES / "stereo-phone-plug-TRS.png"
+CABLE_IMAGE = RESOURCES / "cable-WH+BN+GN+shield.png"
+COLORS = ["RD", "BK", "BU", "GN", "YE", "WH", "VT", "OG"]  # of bundle wires
+PART_NUMBERS = 10  # distinct part numbers per component kind, so BOM entries merge
+
+
+def generate_harness(
+    wirecount: int,
+    wires_per_cable: int = 8,
+    bundle_every: int = 4,
+    image_every: int = 8,
+    additional_every: int = 2,
+    mate_every: int = 4,
+) -> Dict:
+    """Return the YAML data of a harness with the given total number of wires.
+
+    Args:
+        wirecount: Total number of wires.
+        wires_per_cable: Number of wires of each cable or bundle.
+        bundle_every: Every n-th group uses a bundle instead of a cable.
+        image_every: Every n-th group has images on its connectors and cable.
+        additional_every: Every n-th group has additional components.
+        mate_every: Every n-th group has a mating connector (alternating
+            between component and pin mates).
+    """
+    connectors = {}
+    cables = {}
+    connections = []
+    groups = -(-wirecount // wires_per_cable)  # ceiling division
+    for group in range(groups):
+        wires = min(wires_per_cable, wirecount - group * wires_per_cable)
+        pins = f"1-{wires}" if wires > 1 else 1
+        a, b, m, w = (f"X{group}A", f"X{group}B", f"X{group}M", f"W{group}")
+        for side, name in (("female", a), ("male", b)):
+            connectors[name] = {
+                "type": "Molex KK 254",
+                "subtype": side,
+                "pincount": wires,
+                "pinlabels": [f"SIG{group}_{pin}" for pin in range(1, wires + 1)],
+                "manufacturer": "Molex",
+                "mpn": f"22-01-{group % PART_NUMBERS:04d}",
+            }
+        if group % bundle_every == bundle_every - 1:
+            cables[w] = {
+                "category": "bundle",
+                "colors": [COLORS[wire % len(COLORS)] for wire in range(wires)],
+                "gauge": 0.25,
+                "length": round(0.2 + group % 5 * 0.1, 1),
+                "pn": f"WIRE-{group % PART_NUMBERS}",
+            }
+        else:
+            cables[w] = {
+                "wirecount": wires,
+                "color_code": "DIN",
+                "gauge": 0.25,
+                "length": 0.5 + group % 5 * 0.5,
+                "shield": True,
+                "pn": f"CABLE-{group % PART_NUMBERS}",
+            }
+        if group % image_every == 0:
+            connectors[a]["image"] = {"src": str(CONNECTOR_IMAGE), "caption": a}
+            cables[w]["image"] = {"src": str(CABLE_IMAGE), "height": 70}
+        if group % additional_every == 0:
+            connectors[a]["additional_components"] = [
+                {
+                    "type": "Crimp",
+                    "subtype": "Molex KK 254, 22-30 AWG",
+                    "qty_multiplier": "populated",
+                    "manufacturer": "Molex",
+                    "mpn": "08500030",
+                }
+            ]
+            cables[w]["additional_components"] = [
+                {
+                    "type": "Sleeve",
+                    "qty_multiplier": "length",
+                    "unit": "m",
+                    "pn": "SLV-1",
+                }
+            ]
+        connections.append([{a: pins}, {w: pins}, {b: pins}])
+        if group % mate_every == mate_every - 1:
+            connectors[m] = {**connectors[b], "subtype": "female"}
+            connectors[m]["pinlabels"] = list(connectors[b]["pinlabels"])
+            if group // mate_every % 2:
+                connections.append([b, "==>", m])
+            else:
+                connections.append([{b: pins}, "-->", {m: pins}])
+    return {"connectors": connectors, "cables": cables, "connections": connections}
@@ -32,6 +32,8 @@ setup(
     entry_points={
         "console_scripts": [
             "wireviz=wireviz.wv_cli:wireviz",
+            "wireviz-server=wireviz.wv_server:main",
+            "wireviz-bom=wireviz.wv_project:main",
         ],
     },
     classifiers=[
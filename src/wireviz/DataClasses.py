@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from dataclasses import InitVar, dataclass, field
+import sys
+from dataclasses import InitVar, dataclass, field, fields
 from enum import Enum, auto
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from wireviz.wv_colors import COLOR_CODES, Color, ColorMode, Colors, ColorScheme
 from wireviz.wv_helper import aspect_ratio, int2tuple
@@ -42,11 +44,87 @@ MetadataKeys = PlainText  # Literal['title', 'description', 'notes', ...]
 
 Side = Enum("Side", "LEFT RIGHT")
 
+# String attributes of connectors and cables that are stored interned
+INTERNED_FIELDS = (
+    "bgcolor",
+    "bgcolor_title",
+    "manufacturer",
+    "mpn",
+    "supplier",
+    "spn",
+    "pn",
+    "category",
+    "type",
+    "color",
+)
+
 
 class Metadata(dict):
     pass
 
 
+def index_list(items: list) -> Tuple[dict, set]:
+    """Return a mapping from each item to the index of its first occurrence,
+    and the set of items occurring more than once."""
+    indices = {}
+    duplicates = set()
+    for index, item in enumerate(items):
+        if item in indices:
+            duplicates.add(item)
+        else:
+            indices[item] = index
+    return indices, duplicates
+
+
+def shared_index(items: tuple) -> Tuple[tuple, dict, frozenset]:
+    """Return items with the results of index_list(items), shared by all callers
+    with equal items of equal types, e.g. by all cables of the same color code
+    and wirecount.
+
+    The returned objects must not be modified."""
+    # equal items of different types, e.g. 1 and True, must not share an entry
+    return _shared_index(tuple((type(item), item) for item in items))
+
+
+@lru_cache(maxsize=1024)
+def _shared_index(typed_items: tuple) -> Tuple[tuple, dict, frozenset]:
+    items = tuple(item for _, item in typed_items)
+    indices, duplicates = index_list(items)
+    return items, indices, frozenset(duplicates)
+
+
+def intern_str(value):
+    """Return the interned value if it is a string, or the value as is otherwise."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def slotted(cls):
+    """Return a copy of the dataclass cls that uses __slots__ instead of a
+    per-instance __dict__, like dataclass(slots=True) in Python 3.10+.
+
+    Attributes that are not fields, e.g. set by __post_init__(),
+    must be listed in the _extra_slots class attribute.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names + cls_dict.pop("_extra_slots", ())
+    for name in field_names:
+        cls_dict.pop(name, None)  # class attributes of defaults conflict with slots
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
+def copy_slots(obj):
+    """Return a shallow copy of an instance of a slotted() class."""
+    obj_copy = object.__new__(type(obj))
+    for name in obj.__slots__:
+        setattr(obj_copy, name, getattr(obj, name))
+    return obj_copy
+
+
 @dataclass
 class Options:
     fontname: PlainText = "arial"
@@ -58,6 +136,7 @@ class Options:
     color_mode: ColorMode = "SHORT"
     mini_bom_mode: bool = True
     template_separator: str = "."
+    html_bom_page_size: Optional[int] = None
 
     def __post_init__(self):
         if not self.bgcolor_node:
@@ -68,6 +147,13 @@ class Options:
             self.bgcolor_cable = self.bgcolor_node
         if not self.bgcolor_bundle:
             self.bgcolor_bundle = self.bgcolor_cable
+        if self.html_bom_page_size is not None and (
+            type(self.html_bom_page_size) is not int or self.html_bom_page_size < 1
+        ):
+            raise Exception(
+                "html_bom_page_size must be a positive integer, "
+                f"but is: {self.html_bom_page_size!r}"
+            )
 
 
 @dataclass
@@ -76,6 +162,7 @@ class Tweak:
     append: Union[str, List[str], None] = None
 
 
+@slotted
 @dataclass
 class Image:
     # Attributes of the image object <img>:
@@ -114,6 +201,7 @@ class Image:
                     self.height = self.width / aspect_ratio(self.src)
 
 
+@slotted
 @dataclass
 class AdditionalComponent:
     type: MultilineHypertext
@@ -136,6 +224,7 @@ class AdditionalComponent:
         return t
 
 
+@slotted
 @dataclass
 class Connector:
     name: Designator
@@ -153,8 +242,8 @@ class Connector:
     pincount: Optional[int] = None
     image: Optional[Image] = None
     notes: Optional[MultilineHypertext] = None
-    pins: List[Pin] = field(default_factory=list)
-    pinlabels: List[Pin] = field(default_factory=list)
+    pins: Sequence[Pin] = field(default_factory=list)
+    pinlabels: Sequence[Pin] = field(default_factory=list)
     pincolors: List[Color] = field(default_factory=list)
     color: Optional[Color] = None
     show_name: Optional[bool] = None
@@ -164,10 +253,23 @@ class Connector:
     ignore_in_bom: bool = False
     additional_components: List[AdditionalComponent] = field(default_factory=list)
 
+    _extra_slots = (
+        "_auto_show_name",
+        "ports_left",
+        "ports_right",
+        "visible_pins",
+        "_pin_indices",
+        "_pinlabel_indices",
+        "_duplicate_pinlabels",
+    )
+
     def __post_init__(self) -> None:
         if isinstance(self.image, dict):
             self.image = Image(**self.image)
 
+        for name in INTERNED_FIELDS:  # many parts share the same strings
+            setattr(self, name, intern_str(getattr(self, name)))
+
         self.ports_left = False
         self.ports_right = False
         self.visible_pins = {}
@@ -188,14 +290,21 @@ class Connector:
                     "You need to specify at least one, pincount, pins, pinlabels, or pincolors"
                 )
 
-        # create default list for pins (sequential) if not specified
-        if not self.pins:
-            self.pins = list(range(1, self.pincount + 1))
-
-        if len(self.pins) != len(set(self.pins)):
+        # index pins and pin labels once, to avoid linear searches when connecting;
+        # connectors with equal pins or pin labels share them with their indices
+        self.pins, self._pin_indices, duplicate_pins = shared_index(
+            tuple(self.pins or range(1, self.pincount + 1))  # sequential by default
+        )
+        if duplicate_pins:
             raise Exception("Pins are not unique")
-
-        if self.show_name is None:
+        (
+            self.pinlabels,
+            self._pinlabel_indices,
+            self._duplicate_pinlabels,
+        ) = shared_index(tuple(self.pinlabels))
+
+        self._auto_show_name = self.show_name is None
+        if self._auto_show_name:
             # hide designators for simple and for auto-generated connectors by default
             self.show_name = self.style != "simple" and self.name[0:2] != "__"
 
@@ -209,7 +318,7 @@ class Connector:
             if len(loop) != 2:
                 raise Exception("Loops must be between exactly two pins!")
             for pin in loop:
-                if pin not in self.pins:
+                if pin not in self._pin_indices:
                     raise Exception(
                         f'Unknown loop pin "{pin}" for connector "{self.name}"!'
                     )
@@ -220,6 +329,42 @@ class Connector:
             if isinstance(item, dict):
                 self.additional_components[i] = AdditionalComponent(**item)
 
+    def copy(self, name: Designator) -> "Connector":
+        """Return a connector named name, as if created with the same arguments,
+        without validating them again.
+
+        Only meant for connectors that are not yet connected. The copy shares
+        all attributes that are not modified after creation with the original.
+        """
+        connector = copy_slots(self)
+        connector.name = name
+        if self._auto_show_name:
+            connector.show_name = self.style != "simple" and name[0:2] != "__"
+        connector.visible_pins = dict(self.visible_pins)
+        return connector
+
+    def pin_index(self, pin: Pin) -> PinIndex:
+        """Return the zero-based index of a pin number."""
+        return self._pin_indices[pin]
+
+    def resolve_pin(self, pin: Pin) -> Pin:
+        """Return the pin number referenced by a pin number or unique pin label."""
+        label_index = self._pinlabel_indices.get(pin)
+        if label_index is not None:
+            pin_index = self._pin_indices.get(pin)
+            # check if provided name is ambiguous
+            if pin_index is not None and pin_index != label_index:
+                raise Exception(
+                    f"{self.name}:{pin} is defined both in pinlabels and pins, for different pins."
+                )
+            # TODO: Maybe issue a warning if present in both lists but referencing the same pin?
+            if pin in self._duplicate_pinlabels:
+                raise Exception(f"{self.name}:{pin} is defined more than once.")
+            pin = self.pins[label_index]  # map pin name to pin number
+        if pin not in self._pin_indices:
+            raise Exception(f"{self.name}:{pin} not found.")
+        return pin
+
     def activate_pin(self, pin: Pin, side: Side) -> None:
         self.visible_pins[pin] = True
         if side == Side.LEFT:
@@ -242,6 +387,7 @@ class Connector:
             )
 
 
+@slotted
 @dataclass
 class Cable:
     name: Designator
@@ -264,8 +410,8 @@ class Cable:
     shield: Union[bool, Color] = False
     image: Optional[Image] = None
     notes: Optional[MultilineHypertext] = None
-    colors: List[Colors] = field(default_factory=list)
-    wirelabels: List[Wire] = field(default_factory=list)
+    colors: Sequence[Colors] = field(default_factory=list)
+    wirelabels: Sequence[Wire] = field(default_factory=list)
     color_code: Optional[ColorScheme] = None
     show_name: Optional[bool] = None
     show_wirecount: bool = True
@@ -273,10 +419,22 @@ class Cable:
     ignore_in_bom: bool = False
     additional_components: List[AdditionalComponent] = field(default_factory=list)
 
+    _extra_slots = (
+        "_auto_show_name",
+        "connections",
+        "_color_indices",
+        "_duplicate_colors",
+        "_wirelabel_indices",
+        "_duplicate_wirelabels",
+    )
+
     def __post_init__(self) -> None:
         if isinstance(self.image, dict):
             self.image = Image(**self.image)
 
+        for name in INTERNED_FIELDS:
+            setattr(self, name, intern_str(getattr(self, name)))
+
         if isinstance(self.gauge, str):  # gauge and unit specified
             try:
                 g, u = self.gauge.split(" ")
@@ -352,6 +510,17 @@ class Cable:
                     '"s" may not be used as a wire label for a shielded cable.'
                 )
 
+        # index colors and wire labels once, to avoid linear searches when connecting;
+        # cables with equal colors or wire labels share them with their indices
+        self.colors, self._color_indices, self._duplicate_colors = shared_index(
+            tuple(self.colors)
+        )
+        (
+            self.wirelabels,
+            self._wirelabel_indices,
+            self._duplicate_wirelabels,
+        ) = shared_index(tuple(self.wirelabels))
+
         # if lists of part numbers are provided check this is a bundle and that it matches the wirecount.
         for idfield in [self.manufacturer, self.mpn, self.supplier, self.spn, self.pn]:
             if isinstance(idfield, list):
@@ -362,7 +531,8 @@ class Cable:
                 else:
                     raise Exception("lists of part data are only supported for bundles")
 
-        if self.show_name is None:
+        self._auto_show_name = self.show_name is None
+        if self._auto_show_name:
             # hide designators for auto-generated cables by default
             self.show_name = self.name[0:2] != "__"
 
@@ -374,6 +544,42 @@ class Cable:
             if isinstance(item, dict):
                 self.additional_components[i] = AdditionalComponent(**item)
 
+    def copy(self, name: Designator) -> "Cable":
+        """Return a cable named name, as if created with the same arguments,
+        without validating them again.
+
+        Only meant for cables that are not yet connected. The copy shares
+        all attributes that are not modified after creation with the original.
+        """
+        cable = copy_slots(self)
+        cable.name = name
+        if self._auto_show_name:
+            cable.show_name = name[0:2] != "__"
+        cable.connections = []
+        return cable
+
+    def resolve_wire(self, wire: Wire) -> Wire:
+        """Return the wire number referenced by a unique color or wire label,
+        or the wire as is otherwise."""
+        color_index = self._color_indices.get(wire)
+        label_index = self._wirelabel_indices.get(wire)
+        # check if provided name is ambiguous
+        if color_index is not None and label_index is not None:
+            if color_index != label_index:
+                raise Exception(
+                    f"{self.name}:{wire} is defined both in colors and wirelabels, for different wires."
+                )
+            # TODO: Maybe issue a warning if present in both lists but referencing the same wire?
+        if color_index is not None:
+            if wire in self._duplicate_colors:
+                raise Exception(f"{self.name}:{wire} is used for more than one wire.")
+            return color_index + 1  # list index starts at 0, wire IDs start at 1
+        elif label_index is not None:
+            if wire in self._duplicate_wirelabels:
+                raise Exception(f"{self.name}:{wire} is used for more than one wire.")
+            return label_index + 1  # list index starts at 0, wire IDs start at 1
+        return wire
+
     # The *_pin arguments accept a tuple, but it seems not in use with the current code.
     def connect(
         self,
@@ -383,6 +589,8 @@ class Cable:
         to_name: Optional[Designator],
         to_pin: NoneOrMorePinIndices,
     ) -> None:
+        from_name = intern_str(from_name)
+        to_name = intern_str(to_name)
         from_pin = int2tuple(from_pin)
         via_wire = int2tuple(via_wire)
         to_pin = int2tuple(to_pin)
@@ -410,6 +618,7 @@ class Cable:
             )
 
 
+@slotted
 @dataclass
 class Connection:
     from_name: Optional[Designator]
@@ -419,6 +628,7 @@ class Connection:
     to_pin: Optional[Pin]
 
 
+@slotted
 @dataclass
 class MatePin:
     from_name: Designator
@@ -428,6 +638,7 @@ class MatePin:
     shape: str
 
 
+@slotted
 @dataclass
 class MateComponent:
     from_name: Designator
@@ -1,13 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import re
 from collections import Counter
 from dataclasses import dataclass
 from itertools import zip_longest
 from pathlib import Path
-from typing import Any, List, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-from graphviz import Graph
 from wireviz import APP_NAME, APP_URL, __version__, wv_colors
 from wireviz.DataClasses import (
     Cable,
@@ -16,11 +14,13 @@ from wireviz.DataClasses import (
     MatePin,
     Metadata,
     Options,
+    Pin,
     Side,
     Tweak,
 )
-from wireviz.svgembed import embed_svg_images, embed_svg_images_file
+from wireviz.svgembed import embed_svg_images
 from wireviz.wv_bom import (
+    BOM_FILE_FORMATS,
     HEADER_MPN,
     HEADER_PN,
     HEADER_SPN,
@@ -28,7 +28,9 @@ from wireviz.wv_bom import (
     component_table_entry,
     generate_bom,
     get_additional_component_table,
+    get_bom_ids,
     pn_info_string,
+    write_bom_file,
 )
 from wireviz.wv_colors import get_color_hex, translate_color
 from wireviz.wv_gv_html import (
@@ -47,9 +49,12 @@ from wireviz.wv_helper import (
     flatten2d,
     is_arrow,
     mm2_equiv,
-    tuplelist2tsv,
 )
 from wireviz.wv_html import generate_html_output
+from wireviz.wv_profile import stage
+
+if TYPE_CHECKING:
+    from graphviz import Graph  # imported when the first graph is created
 
 OLD_CONNECTOR_ATTR = {
     "pinout": "was renamed to 'pinlabels' in v0.2",
@@ -65,6 +70,27 @@ def check_old(node: str, old_attr: dict, args: dict) -> None:
             raise ValueError(f"'{attr}' in {node}: '{attr}' {descr}")
 
 
+def typecheck(name: str, value: Any, expect: type) -> None:
+    if not isinstance(value, expect):
+        raise Exception(
+            f"Unexpected value type of {name}: Expected {expect}, got {type(value)}\n{value}"
+        )
+
+
+def override_attributes(
+    keyword: str, attrs: Dict[str, str], override: Dict[str, Optional[str]]
+) -> Dict[str, str]:
+    """Return the attributes of a DOT statement with tweak.override applied,
+    where a value of None removes the attribute."""
+    attrs = dict(attrs)
+    for attr, value in override.items():
+        if value is not None:
+            attrs[attr] = value
+        elif attrs.pop(attr, None) is None:
+            print(f"Harness.create_graph() warning: {attr} not found in {keyword}!")
+    return attrs
+
+
 @dataclass
 class Harness:
     metadata: Metadata
@@ -76,6 +102,7 @@ class Harness:
         self.cables = {}
         self.mates = []
         self._bom = []  # Internal Cache for generated bom
+        self._bom_ids = {}  # Internal Cache for ids of generated bom entries by key
         self.additional_bom_items = []
 
     def add_connector(self, name: str, *args, **kwargs) -> None:
@@ -85,6 +112,13 @@ class Harness:
     def add_cable(self, name: str, *args, **kwargs) -> None:
         self.cables[name] = Cable(name, *args, **kwargs)
 
+    def add_component_copy(self, name: str, component: Union[Connector, Cable]) -> None:
+        """Add a copy named name of a connector or cable that is not yet connected."""
+        if isinstance(component, Connector):
+            self.connectors[name] = component.copy(name)
+        else:
+            self.cables[name] = component.copy(name)
+
     def add_mate_pin(self, from_name, from_pin, to_name, to_pin, arrow_type) -> None:
         self.mates.append(MatePin(from_name, from_pin, to_name, to_pin, arrow_type))
         self.connectors[from_name].activate_pin(from_pin, Side.RIGHT)
@@ -108,51 +142,17 @@ class Harness:
         # check from and to connectors
         for name, pin in zip([from_name, to_name], [from_pin, to_pin]):
             if name is not None and name in self.connectors:
-                connector = self.connectors[name]
-                # check if provided name is ambiguous
-                if pin in connector.pins and pin in connector.pinlabels:
-                    if connector.pins.index(pin) != connector.pinlabels.index(pin):
-                        raise Exception(
-                            f"{name}:{pin} is defined both in pinlabels and pins, for different pins."
-                        )
-                    # TODO: Maybe issue a warning if present in both lists but referencing the same pin?
-                if pin in connector.pinlabels:
-                    if connector.pinlabels.count(pin) > 1:
-                        raise Exception(f"{name}:{pin} is defined more than once.")
-                    index = connector.pinlabels.index(pin)
-                    pin = connector.pins[index]  # map pin name to pin number
-                    if name == from_name:
-                        from_pin = pin
-                    if name == to_name:
-                        to_pin = pin
-                if not pin in connector.pins:
-                    raise Exception(f"{name}:{pin} not found.")
+                # map pin name to pin number
+                pin = self.connectors[name].resolve_pin(pin)
+                if name == from_name:
+                    from_pin = pin
+                if name == to_name:
+                    to_pin = pin
 
         # check via cable
         if via_name in self.cables:
-            cable = self.cables[via_name]
-            # check if provided name is ambiguous
-            if via_wire in cable.colors and via_wire in cable.wirelabels:
-                if cable.colors.index(via_wire) != cable.wirelabels.index(via_wire):
-                    raise Exception(
-                        f"{via_name}:{via_wire} is defined both in colors and wirelabels, for different wires."
-                    )
-                # TODO: Maybe issue a warning if present in both lists but referencing the same wire?
-            if via_wire in cable.colors:
-                if cable.colors.count(via_wire) > 1:
-                    raise Exception(
-                        f"{via_name}:{via_wire} is used for more than one wire."
-                    )
-                # list index starts at 0, wire IDs start at 1
-                via_wire = cable.colors.index(via_wire) + 1
-            elif via_wire in cable.wirelabels:
-                if cable.wirelabels.count(via_wire) > 1:
-                    raise Exception(
-                        f"{via_name}:{via_wire} is used for more than one wire."
-                    )
-                via_wire = (
-                    cable.wirelabels.index(via_wire) + 1
-                )  # list index starts at 0, wire IDs start at 1
+            # map color or wire label to wire number
+            via_wire = self.cables[via_name].resolve_wire(via_wire)
 
         # perform the actual connection
         self.cables[via_name].connect(from_name, from_pin, via_wire, to_name, to_pin)
@@ -161,11 +161,48 @@ class Harness:
         if to_name in self.connectors:
             self.connectors[to_name].activate_pin(to_pin, Side.LEFT)
 
-    def create_graph(self) -> Graph:
+    def endpoint_label(self, name: str, pin: Pin) -> str:
+        """Return the connector pin label shown next to a connected wire."""
+        connector = self.connectors[name]
+        if not connector.show_name:
+            return ""
+        info = [str(name), str(pin)]
+        if connector.pinlabels:
+            pinlabel = connector.pinlabels[connector.pin_index(pin)]
+            if pinlabel != "":
+                info.append(pinlabel)
+        return ":".join(info)
+
+    def create_graph(self) -> "Graph":
+        from graphviz import Graph
+
+        # TODO?: Differ between override attributes and HTML?
+        override = self.tweak.override or {}
+        typecheck("tweak.override", override, dict)
+        for k, d in override.items():
+            typecheck(f"tweak.override.{k} key", k, str)
+            typecheck(f"tweak.override.{k} value", d, dict)
+            for a, v in d.items():
+                typecheck(f"tweak.override.{k}.{a} key", a, str)
+                typecheck(f"tweak.override.{k}.{a} value", v, (str, type(None)))
+
         dot = Graph()
+
+        # All node and attribute statements are added by these functions,
+        # which apply the attributes of tweak.override for their identifier.
+        def add_node(name: str, **attrs) -> None:
+            if name in override:
+                attrs = override_attributes(name, attrs, override[name])
+            dot.node(name, **attrs)
+
+        def add_attr(kw: str, **attrs) -> None:
+            if kw in override:
+                attrs = override_attributes(kw, attrs, override[kw])
+            dot.attr(kw, **attrs)
+
         dot.body.append(f"// Graph generated by {APP_NAME} {__version__}\n")
         dot.body.append(f"// {APP_URL}\n")
-        dot.attr(
+        add_attr(
             "graph",
             rankdir="LR",
             ranksep="2",
@@ -173,7 +210,7 @@ class Harness:
             nodesep="0.33",
             fontname=self.options.fontname,
         )  # TODO: Add graph attribute: charset="utf-8",
-        dot.attr(
+        add_attr(
             "node",
             shape="none",
             width="0",
@@ -183,7 +220,7 @@ class Harness:
             fillcolor=wv_colors.translate_color(self.options.bgcolor_node, "HEX"),
             fontname=self.options.fontname,
         )
-        dot.attr("edge", style="bold", fontname=self.options.fontname)
+        add_attr("edge", style="bold", fontname=self.options.fontname)
 
         for connector in self.connectors.values():
             # If no wires connected (except maybe loop wires)?
@@ -261,7 +298,7 @@ class Harness:
                 ]
 
             html = "\n".join(html)
-            dot.node(
+            add_node(
                 connector.name,
                 label=f"<\n{html}\n>",
                 shape="box",
@@ -270,7 +307,7 @@ class Harness:
             )
 
             if len(connector.loops) > 0:
-                dot.attr("edge", color="#000000:#ffffff:#000000")
+                add_attr("edge", color="#000000:#ffffff:#000000")
                 if connector.ports_left:
                     loop_side = "l"
                     loop_dir = "w"
@@ -334,6 +371,28 @@ class Harness:
             rows.append([html_line_breaks(cable.notes)])
             html.extend(nested_html_table(rows, html_bgcolor_attr(cable.bgcolor)))
 
+            # collect the connection endpoint labels of each wire first,
+            # to build the wire table with the final strings in place
+            wire_in_labels = {}
+            wire_out_labels = {}
+            for connection in cable.connections:
+                via_port = str(connection.via_port)
+                # if a wire has several connections on one side, the first one is shown
+                if connection.from_pin is not None and via_port not in wire_in_labels:
+                    wire_in_labels[via_port] = self.endpoint_label(
+                        connection.from_name, connection.from_pin
+                    )
+                if connection.to_pin is not None and via_port not in wire_out_labels:
+                    wire_out_labels[via_port] = self.endpoint_label(
+                        connection.to_name, connection.to_pin
+                    )
+
+            def wire_in(port: str) -> str:
+                return wire_in_labels.get(port, f"<!-- {port}_in -->")
+
+            def wire_out(port: str) -> str:
+                return wire_out_labels.get(port, f"<!-- {port}_out -->")
+
             wirehtml = []
             # conductor table
             wirehtml.append('<table border="0" cellspacing="0" cellborder="0">')
@@ -343,7 +402,7 @@ class Harness:
                 zip_longest(cable.colors, cable.wirelabels), 1
             ):
                 wirehtml.append("   <tr>")
-                wirehtml.append(f"    <td><!-- {i}_in --></td>")
+                wirehtml.append(f"    <td>{wire_in(str(i))}</td>")
                 wirehtml.append(f"    <td>")
 
                 wireinfo = []
@@ -359,7 +418,7 @@ class Harness:
                 wirehtml.append(f'     {":".join(wireinfo)}')
 
                 wirehtml.append(f"    </td>")
-                wirehtml.append(f"    <td><!-- {i}_out --></td>")
+                wirehtml.append(f"    <td>{wire_out(str(i))}</td>")
                 wirehtml.append("   </tr>")
 
                 # fmt: off
@@ -420,9 +479,9 @@ class Harness:
             if cable.shield:
                 wirehtml.append("   <tr><td>&nbsp;</td></tr>")  # spacer
                 wirehtml.append("   <tr>")
-                wirehtml.append("    <td><!-- s_in --></td>")
+                wirehtml.append(f"    <td>{wire_in('s')}</td>")
                 wirehtml.append("    <td>Shield</td>")
-                wirehtml.append("    <td><!-- s_out --></td>")
+                wirehtml.append(f"    <td>{wire_out('s')}</td>")
                 wirehtml.append("   </tr>")
                 if isinstance(cable.shield, str):
                     # shield is shown with specified color and black borders
@@ -448,7 +507,7 @@ class Harness:
             for connection in cable.connections:
                 if isinstance(connection.via_port, int):
                     # check if it's an actual wire and not a shield
-                    dot.attr(
+                    add_attr(
                         "edge",
                         color=":".join(
                             ["#000000"]
@@ -460,7 +519,7 @@ class Harness:
                     )
                 else:  # it's a shield connection
                     # shield is shown with specified color and black borders, or as a thin black wire otherwise
-                    dot.attr(
+                    add_attr(
                         "edge",
                         color=(
                             ":".join(["#000000", shield_color_hex, "#000000"])
@@ -470,7 +529,7 @@ class Harness:
                     )
                 if connection.from_pin is not None:  # connect to left
                     from_connector = self.connectors[connection.from_name]
-                    from_pin_index = from_connector.pins.index(connection.from_pin)
+                    from_pin_index = from_connector.pin_index(connection.from_pin)
                     from_port_str = (
                         f":p{from_pin_index+1}r"
                         if from_connector.style != "simple"
@@ -479,44 +538,15 @@ class Harness:
                     code_left_1 = f"{connection.from_name}{from_port_str}:e"
                     code_left_2 = f"{cable.name}:w{connection.via_port}:w"
                     dot.edge(code_left_1, code_left_2)
-                    if from_connector.show_name:
-                        from_info = [
-                            str(connection.from_name),
-                            str(connection.from_pin),
-                        ]
-                        if from_connector.pinlabels:
-                            pinlabel = from_connector.pinlabels[from_pin_index]
-                            if pinlabel != "":
-                                from_info.append(pinlabel)
-                        from_string = ":".join(from_info)
-                    else:
-                        from_string = ""
-                    html = [
-                        row.replace(f"<!-- {connection.via_port}_in -->", from_string)
-                        for row in html
-                    ]
                 if connection.to_pin is not None:  # connect to right
                     to_connector = self.connectors[connection.to_name]
-                    to_pin_index = to_connector.pins.index(connection.to_pin)
+                    to_pin_index = to_connector.pin_index(connection.to_pin)
                     to_port_str = (
                         f":p{to_pin_index+1}l" if to_connector.style != "simple" else ""
                     )
                     code_right_1 = f"{cable.name}:w{connection.via_port}:e"
                     code_right_2 = f"{connection.to_name}{to_port_str}:w"
                     dot.edge(code_right_1, code_right_2)
-                    if to_connector.show_name:
-                        to_info = [str(connection.to_name), str(connection.to_pin)]
-                        if to_connector.pinlabels:
-                            pinlabel = to_connector.pinlabels[to_pin_index]
-                            if pinlabel != "":
-                                to_info.append(pinlabel)
-                        to_string = ":".join(to_info)
-                    else:
-                        to_string = ""
-                    html = [
-                        row.replace(f"<!-- {connection.via_port}_out -->", to_string)
-                        for row in html
-                    ]
 
             style, bgcolor = (
                 ("filled,dashed", self.options.bgcolor_bundle)
@@ -524,7 +554,7 @@ class Harness:
                 else ("filled", self.options.bgcolor_cable)
             )
             html = "\n".join(html)
-            dot.node(
+            add_node(
                 cable.name,
                 label=f"<\n{html}\n>",
                 shape="box",
@@ -549,85 +579,30 @@ class Harness:
             from_connector = self.connectors[mate.from_name]
             to_connector = self.connectors[mate.to_name]
             if isinstance(mate, MatePin) and from_connector.style != "simple":
-                from_pin_index = from_connector.pins.index(mate.from_pin)
+                from_pin_index = from_connector.pin_index(mate.from_pin)
                 from_port_str = f":p{from_pin_index+1}r"
             else:  # MateComponent or style == 'simple'
                 from_port_str = ""
             if isinstance(mate, MatePin) and to_connector.style != "simple":
-                to_pin_index = to_connector.pins.index(mate.to_pin)
+                to_pin_index = to_connector.pin_index(mate.to_pin)
                 to_port_str = f":p{to_pin_index+1}l"
             else:  # MateComponent or style == 'simple'
                 to_port_str = ""
             code_from = f"{mate.from_name}{from_port_str}:e"
             code_to = f"{mate.to_name}{to_port_str}:w"
 
-            dot.attr("edge", color=color, style="dashed", dir=dir)
+            add_attr("edge", color=color, style="dashed", dir=dir)
             dot.edge(code_from, code_to)
 
-        def typecheck(name: str, value: Any, expect: type) -> None:
-            if not isinstance(value, expect):
-                raise Exception(
-                    f"Unexpected value type of {name}: Expected {expect}, got {type(value)}\n{value}"
-                )
-
-        # TODO?: Differ between override attributes and HTML?
-        if self.tweak.override is not None:
-            typecheck("tweak.override", self.tweak.override, dict)
-            for k, d in self.tweak.override.items():
-                typecheck(f"tweak.override.{k} key", k, str)
-                typecheck(f"tweak.override.{k} value", d, dict)
-                for a, v in d.items():
-                    typecheck(f"tweak.override.{k}.{a} key", a, str)
-                    typecheck(f"tweak.override.{k}.{a} value", v, (str, type(None)))
-
-            # Override generated attributes of selected entries matching tweak.override.
-            for i, entry in enumerate(dot.body):
-                if isinstance(entry, str):
-                    # Find a possibly quoted keyword after leading TAB(s) and followed by [ ].
-                    match = re.match(
-                        r'^\t*(")?((?(1)[^"]|[^ "])+)(?(1)") \[.*\]$', entry, re.S
-                    )
-                    keyword = match and match[2]
-                    if keyword in self.tweak.override.keys():
-                        for attr, value in self.tweak.override[keyword].items():
-                            if value is None:
-                                entry, n_subs = re.subn(
-                                    f'( +)?{attr}=("[^"]*"|[^] ]*)(?(1)| *)', "", entry
-                                )
-                                if n_subs < 1:
-                                    print(
-                                        f"Harness.create_graph() warning: {attr} not found in {keyword}!"
-                                    )
-                                elif n_subs > 1:
-                                    print(
-                                        f"Harness.create_graph() warning: {attr} removed {n_subs} times in {keyword}!"
-                                    )
-                                continue
-
-                            if len(value) == 0 or " " in value:
-                                value = value.replace('"', r"\"")
-                                value = f'"{value}"'
-                            entry, n_subs = re.subn(
-                                f'{attr}=("[^"]*"|[^] ]*)', f"{attr}={value}", entry
-                            )
-                            if n_subs < 1:
-                                # If attr not found, then append it
-                                entry = re.sub(r"\]$", f" {attr}={value}]", entry)
-                            elif n_subs > 1:
-                                print(
-                                    f"Harness.create_graph() warning: {attr} overridden {n_subs} times in {keyword}!"
-                                )
-
-                        dot.body[i] = entry
-
-        if self.tweak.append is not None:
-            if isinstance(self.tweak.append, list):
-                for i, element in enumerate(self.tweak.append, 1):
-                    typecheck(f"tweak.append[{i}]", element, str)
-                dot.body.extend(self.tweak.append)
-            else:
-                typecheck("tweak.append", self.tweak.append, str)
-                dot.body.append(self.tweak.append)
+        with stage("tweak"):
+            if self.tweak.append is not None:
+                if isinstance(self.tweak.append, list):
+                    for i, element in enumerate(self.tweak.append, 1):
+                        typecheck(f"tweak.append[{i}]", element, str)
+                    dot.body.extend(self.tweak.append)
+                else:
+                    typecheck("tweak.append", self.tweak.append, str)
+                    dot.body.append(self.tweak.append)
 
         # Tweak processing above must be the last before returning dot.
         # Please don't insert any code that might change the dot contents
@@ -642,74 +617,112 @@ class Harness:
     @property
     def graph(self):
         if not self._graph:  # no cached graph exists, generate one
-            self._graph = self.create_graph()
+            with stage("create_graph"):
+                self._graph = self.create_graph()
         return self._graph  # return cached graph
 
     @property
     def png(self):
         from io import BytesIO
 
+        from wireviz.wv_render import pipe_format
+
         graph = self.graph
         data = BytesIO()
-        data.write(graph.pipe(format="png"))
+        with stage("render"):
+            data.write(pipe_format(graph, "png"))
         data.seek(0)
         return data.read()
 
     @property
     def svg(self):  # TODO?: Verify xml encoding="utf-8" in SVG?
+        from wireviz.wv_render import pipe_format
+
         graph = self.graph
-        return embed_svg_images(graph.pipe(format="svg").decode("utf-8"), Path.cwd())
+        with stage("render"):
+            svg = pipe_format(graph, "svg").decode("utf-8")
+        with stage("embed_svg"):
+            return embed_svg_images(svg, Path.cwd())
 
     def output(
         self,
         filename: (str, Path),
         view: bool = False,
-        cleanup: bool = True,
+        cleanup: Optional[bool] = None,
         fmt: tuple = ("html", "png", "svg", "tsv"),
     ) -> None:
-        # graphical output
-        graph = self.graph
-        svg_already_exists = Path(
-            f"{filename}.svg"
-        ).exists()  # if SVG already exists, do not delete later
-        # graphical output
-        for f in fmt:
-            if f in ("png", "svg", "html"):
-                if f == "html":  # if HTML format is specified,
-                    f = "svg"  # generate SVG for embedding into HTML
-                # SVG file will be renamed/deleted later
-                _filename = f"{filename}.tmp" if f == "svg" else filename
-                # TODO: prevent rendering SVG twice when both SVG and HTML are specified
-                graph.format = f
-                graph.render(filename=_filename, view=view, cleanup=cleanup)
+        """Write the output files {filename}.{format} of the given formats.
+
+        The cleanup argument is deprecated and ignored, since no temporary
+        files are created anymore. It will be removed in a future version.
+        """
+        if cleanup is not None:
+            import warnings
+
+            warnings.warn(
+                "Harness.output(): cleanup is deprecated and ignored",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        # graphical output, the graph is only created if any format needs it
+        # render all diagram formats from one Graphviz layout pass
+        render_outputs = {}
+        if "png" in fmt:
+            render_outputs["png"] = f"{filename}.png"
+        if "svg" in fmt or "html" in fmt:
+            # SVG is kept in memory, for embedding images and into HTML
+            render_outputs["svg"] = None
+        if "pdf" in fmt:
+            render_outputs["pdf"] = f"{filename}.pdf"
+        if render_outputs:
+            from wireviz.wv_render import render_formats
+
+            graph = self.graph
+            with stage("render"):
+                rendered = render_formats(graph, render_outputs)
+        if view:
+            import graphviz
+
+            for f, _filename in render_outputs.items():
+                if _filename:
+                    graphviz.view(_filename)
         # embed images into SVG output
+        svg = None
         if "svg" in fmt or "html" in fmt:
-            embed_svg_images_file(f"{filename}.tmp.svg")
+            with stage("embed_svg"):
+                # TODO?: Verify xml encoding="utf-8" in SVG?
+                svg = embed_svg_images(
+                    rendered["svg"].decode("utf-8"), Path(filename).parent.resolve()
+                )
+        if "svg" in fmt:
+            file_write_text(f"{filename}.svg", svg)
+            if view:
+                graphviz.view(f"{filename}.svg")
         # GraphViz output
         if "gv" in fmt:
-            graph.save(filename=f"{filename}.gv")
+            graph = self.graph
+            with stage("gv"):
+                graph.save(filename=f"{filename}.gv")
         # BOM output
-        bomlist = bom_list(self.bom())
-        if "tsv" in fmt:
-            file_write_text(f"{filename}.bom.tsv", tuplelist2tsv(bomlist))
-        if "csv" in fmt:
-            # TODO: implement CSV output (preferrably using CSV library)
-            print("CSV output is not yet supported")
+        with stage("bom"):
+            bom = self.bom()
+        for bom_fmt in BOM_FILE_FORMATS:
+            if bom_fmt in fmt:
+                with stage(bom_fmt):
+                    write_bom_file(bom, f"{filename}.bom.{bom_fmt}", bom_fmt)
         # HTML output
         if "html" in fmt:
-            generate_html_output(filename, bomlist, self.metadata, self.options)
-        # PDF output
-        if "pdf" in fmt:
-            # TODO: implement PDF output
-            print("PDF output is not yet supported")
-        # delete SVG if not needed
-        if "html" in fmt and not "svg" in fmt:
-            # SVG file was just needed to generate HTML
-            Path(f"{filename}.tmp.svg").unlink()
-        elif "svg" in fmt:
-            Path(f"{filename}.tmp.svg").replace(f"{filename}.svg")
+            with stage("html"):
+                generate_html_output(
+                    filename, bom_list(bom), self.metadata, self.options, svg
+                )
 
     def bom(self):
         if not self._bom:
             self._bom = generate_bom(self)
+            self._bom_ids = get_bom_ids(self._bom)
         return self._bom
+
+    def bom_ids(self):
+        self.bom()  # generate bom and its ids once
+        return self._bom_ids
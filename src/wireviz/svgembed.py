@@ -2,17 +2,55 @@
 
 import base64
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Union
+from typing import Tuple, Union
 
 mime_subtype_replacements = {"jpg": "jpeg", "tif": "tiff"}
 
 
-# TODO: Share cache and code between data_URI_base64() and embed_svg_images()
+class Base64Cache:
+    """Least recently used cache of Base64-encoded files, bounded by total size.
+
+    Entries are keyed on the resolved path, modification time and size of the file,
+    so a changed file is encoded again.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size  # total length of cached Base64 strings
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[Path, int, int], str]" = OrderedDict()
+
+    def encode(self, file: Union[str, Path]) -> str:
+        """Return the Base64-encoded contents of the file."""
+        file = Path(file).resolve()
+        stat = file.stat()
+        key = (file, stat.st_mtime_ns, stat.st_size)
+        b64 = self.entries.get(key)
+        if b64 is not None:
+            self.entries.move_to_end(key)
+            return b64
+        b64 = base64.b64encode(file.read_bytes()).decode("utf-8")
+        self.entries[key] = b64
+        self.size += len(b64)
+        while self.size > self.max_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+        return b64
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+
+# Shared by all SVG and HTML outputs generated in this process
+b64_cache = Base64Cache(max_size=64 * 1024 * 1024)
+
+
 def data_URI_base64(file: Union[str, Path], media: str = "image") -> str:
     """Return Base64-encoded data URI of input file."""
     file = Path(file)
-    b64 = base64.b64encode(file.read_bytes()).decode("utf-8")
+    b64 = b64_cache.encode(file)
     uri = f"data:{media}/{get_mime_subtype(file)};base64, {b64}"
     # print(f"data_URI_base64('{file}', '{media}') -> {len(uri)}-character URI")
     if len(uri) > 65535:
@@ -23,17 +61,15 @@ def data_URI_base64(file: Union[str, Path], media: str = "image") -> str:
 
 
 def embed_svg_images(svg_in: str, base_path: Union[str, Path] = Path.cwd()) -> str:
-    images_b64 = {}  # cache of base64-encoded images
+    images_b64 = {}  # base64-encoded images by URL within this SVG
 
     def image_tag(pre: str, url: str, post: str) -> str:
         return f'<image{pre} xlink:href="{url}"{post}>'
 
     def replace(match: re.Match) -> str:
         imgurl = match["URL"]
-        if not imgurl in images_b64:  # only encode/cache every unique URL once
-            imgurl_abs = (Path(base_path) / imgurl).resolve()
-            image = imgurl_abs.read_bytes()
-            images_b64[imgurl] = base64.b64encode(image).decode("utf-8")
+        if not imgurl in images_b64:  # only look up every unique URL once
+            images_b64[imgurl] = b64_cache.encode(Path(base_path) / imgurl)
         return image_tag(
             match["PRE"] or "",
             f"data:image/{get_mime_subtype(imgurl)};base64, {images_b64[imgurl]}",
@@ -57,6 +93,18 @@ def get_mime_subtype(filename: Union[str, Path]) -> str:
 def embed_svg_images_file(
     filename_in: Union[str, Path], overwrite: bool = True
 ) -> None:
+    """Embed the images of an SVG file (see embed_svg_images()).
+
+    Deprecated: WireViz embeds the images of the rendered SVG in memory,
+    and does not call this anymore. It will be removed in a future version.
+    """
+    import warnings
+
+    warnings.warn(
+        "embed_svg_images_file() is deprecated, use embed_svg_images()",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     filename_in = Path(filename_in).resolve()
     filename_out = filename_in.with_suffix(".b64.svg")
     filename_out.write_text(  # TODO?: Verify xml encoding="utf-8" in SVG?
@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import platform
+import pickle
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import yaml
 
 if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))  # add src/wireviz to PATH
 
-from wireviz.DataClasses import Metadata, Options, Tweak
+from wireviz.DataClasses import Cable, Connector, Metadata, Options, Tweak
 from wireviz.Harness import Harness
 from wireviz.wv_helper import (
     expand,
@@ -20,6 +21,7 @@ from wireviz.wv_helper import (
     is_arrow,
     smart_file_resolve,
 )
+from wireviz.wv_profile import stage
 
 from . import APP_NAME
 
@@ -31,6 +33,7 @@ def parse(
     output_dir: Union[str, Path] = None,
     output_name: Union[None, str] = None,
     image_paths: Union[Path, str, List] = [],
+    templates: Optional[Dict[str, Union[Connector, Cable]]] = None,
 ) -> Any:
     """
     This function takes an input, parses it as a WireViz Harness file,
@@ -50,8 +53,9 @@ def parse(
         * "csv":  the BOM, as a comma-separated text file
         * "gv":   the diagram, as a GraphViz source file
         * "html": the diagram and (depending on the template) the BOM, as a HTML file
+        * "jsonl": the BOM, as a JSON Lines text file
         * "png":  the diagram, as a PNG raster image
-        * "pdf":  the diagram and (depending on the template) the BOM, as a PDF file
+        * "pdf":  the diagram, as a PDF file
         * "svg":  the diagram, as a SVG vector image
         * "tsv":  the BOM, as a tab-separated text file
 
@@ -75,6 +79,10 @@ def parse(
             Paths to use when resolving any image paths included in the data.
             Note: If inp is a path to a YAML file,
             its parent directory will automatically be included in the list.
+        templates (Dict, optional):
+            Connectors and cables already created from the templates of the
+            same name (see Prepend.templates()), which are copied for each
+            instance of these templates instead of validating them again.
 
     Returns:
         Depending on the return_types parameter, may return:
@@ -88,7 +96,8 @@ def parse(
     if not output_formats and not return_types:
         raise Exception("No output formats or return types specified")
 
-    yaml_data, yaml_file = _get_yaml_data_and_path(inp)
+    with stage("load_yaml"):
+        yaml_data, yaml_file = _get_yaml_data_and_path(inp)
     if not isinstance(yaml_data, dict):
         raise TypeError(
             f"Expected a dict as top-level YAML input, but got: {type(yaml_data)}"
@@ -121,6 +130,8 @@ def parse(
     designators_and_templates = {}
     # keep track of auto-generated designators to avoid duplicates
     autogenerated_designators = {}
+    # unconnected copy of the first instance of each template, to copy further ones
+    template_instances = dict(templates or {})
 
     # When title is not given, either deduce it from filename, or use default text.
     if "title" not in harness.metadata:
@@ -129,33 +140,34 @@ def parse(
     # add items
     # parse YAML input file ====================================================
 
-    sections = ["connectors", "cables", "connections"]
-    types = [dict, dict, list]
-    for sec, ty in zip(sections, types):
-        if sec in yaml_data and type(yaml_data[sec]) == ty:  # section exists
-            if len(yaml_data[sec]) > 0:  # section has contents
+    with stage("templates"):
+        sections = ["connectors", "cables", "connections"]
+        types = [dict, dict, list]
+        for sec, ty in zip(sections, types):
+            if sec in yaml_data and type(yaml_data[sec]) == ty:  # section exists
+                if len(yaml_data[sec]) > 0:  # section has contents
+                    if ty == dict:
+                        for key, attribs in yaml_data[sec].items():
+                            # The Image dataclass might need to open an image file with a relative path.
+                            image = attribs.get("image")
+                            if isinstance(image, dict):
+                                image_path = image["src"]
+                                if image_path and not Path(image_path).is_absolute():
+                                    # resolve relative image path
+                                    image["src"] = smart_file_resolve(
+                                        image_path, image_paths
+                                    )
+                            if sec == "connectors":
+                                template_connectors[key] = attribs
+                            elif sec == "cables":
+                                template_cables[key] = attribs
+                else:  # section exists but is empty
+                    pass
+            else:  # section does not exist, create empty section
                 if ty == dict:
-                    for key, attribs in yaml_data[sec].items():
-                        # The Image dataclass might need to open an image file with a relative path.
-                        image = attribs.get("image")
-                        if isinstance(image, dict):
-                            image_path = image["src"]
-                            if image_path and not Path(image_path).is_absolute():
-                                # resolve relative image path
-                                image["src"] = smart_file_resolve(
-                                    image_path, image_paths
-                                )
-                        if sec == "connectors":
-                            template_connectors[key] = attribs
-                        elif sec == "cables":
-                            template_cables[key] = attribs
-            else:  # section exists but is empty
-                pass
-        else:  # section does not exist, create empty section
-            if ty == dict:
-                yaml_data[sec] = {}
-            elif ty == list:
-                yaml_data[sec] = []
+                    yaml_data[sec] = {}
+                elif ty == list:
+                    yaml_data[sec] = []
 
     connection_sets = yaml_data["connections"]
 
@@ -288,16 +300,36 @@ def parse(
                 elif template in template_connectors.keys():
                     # generate new connector instance from template
                     check_type(designator, template, "connector")
-                    harness.add_connector(
-                        name=designator, **template_connectors[template]
-                    )
+                    with stage("instantiate"):
+                        if template in template_instances:
+                            harness.add_component_copy(
+                                designator, template_instances[template]
+                            )
+                        else:
+                            harness.add_connector(
+                                name=designator, **template_connectors[template]
+                            )
+                            template_instances[template] = harness.connectors[
+                                designator
+                            ].copy(designator)
 
                 elif designator in harness.cables:  # existing cable instance
                     check_type(designator, template, "cable/arrow")
                 elif template in template_cables.keys():
                     # generate new cable instance from template
                     check_type(designator, template, "cable/arrow")
-                    harness.add_cable(name=designator, **template_cables[template])
+                    with stage("instantiate"):
+                        if template in template_instances:
+                            harness.add_component_copy(
+                                designator, template_instances[template]
+                            )
+                        else:
+                            harness.add_cable(
+                                name=designator, **template_cables[template]
+                            )
+                            template_instances[template] = harness.cables[
+                                designator
+                            ].copy(designator)
 
                 elif is_arrow(designator):
                     check_type(designator, template, "cable/arrow")
@@ -314,53 +346,56 @@ def parse(
         # after:  one item per connection in set, one subitem per component
         connection_set = list(map(list, zip(*connection_set)))
 
-        # connect components
-        for index_entry, entry in enumerate(connection_set):
-            for index_item, item in enumerate(entry):
-                designator = list(item.keys())[0]
+        with stage("connect"):
+            # connect components
+            for index_entry, entry in enumerate(connection_set):
+                for index_item, item in enumerate(entry):
+                    designator = list(item.keys())[0]
+
+                    if designator in harness.cables:
+                        if index_item == 0:
+                            # list started with a cable, no connector to join on left side
+                            from_name, from_pin = (None, None)
+                        else:
+                            from_name, from_pin = get_single_key_and_value(
+                                entry[index_item - 1]
+                            )
+                        via_name, via_pin = (designator, item[designator])
+                        if index_item == len(entry) - 1:
+                            # list ends with a cable, no connector to join on right side
+                            to_name, to_pin = (None, None)
+                        else:
+                            to_name, to_pin = get_single_key_and_value(
+                                entry[index_item + 1]
+                            )
+                        harness.connect(
+                            from_name, from_pin, via_name, via_pin, to_name, to_pin
+                        )
+
+                    elif is_arrow(designator):
+                        if index_item == 0:  # list starts with an arrow
+                            raise Exception(
+                                "An arrow cannot be at the start of a connection set"
+                            )
+                        elif index_item == len(entry) - 1:  # list ends with an arrow
+                            raise Exception(
+                                "An arrow cannot be at the end of a connection set"
+                            )
 
-                if designator in harness.cables:
-                    if index_item == 0:
-                        # list started with a cable, no connector to join on left side
-                        from_name, from_pin = (None, None)
-                    else:
                         from_name, from_pin = get_single_key_and_value(
                             entry[index_item - 1]
                         )
-                    via_name, via_pin = (designator, item[designator])
-                    if index_item == len(entry) - 1:
-                        # list ends with a cable, no connector to join on right side
-                        to_name, to_pin = (None, None)
-                    else:
+                        via_name, via_pin = (designator, None)
                         to_name, to_pin = get_single_key_and_value(
                             entry[index_item + 1]
                         )
-                    harness.connect(
-                        from_name, from_pin, via_name, via_pin, to_name, to_pin
-                    )
-
-                elif is_arrow(designator):
-                    if index_item == 0:  # list starts with an arrow
-                        raise Exception(
-                            "An arrow cannot be at the start of a connection set"
-                        )
-                    elif index_item == len(entry) - 1:  # list ends with an arrow
-                        raise Exception(
-                            "An arrow cannot be at the end of a connection set"
-                        )
-
-                    from_name, from_pin = get_single_key_and_value(
-                        entry[index_item - 1]
-                    )
-                    via_name, via_pin = (designator, None)
-                    to_name, to_pin = get_single_key_and_value(entry[index_item + 1])
-                    if "-" in designator:  # mate pin by pin
-                        harness.add_mate_pin(
-                            from_name, from_pin, to_name, to_pin, designator
-                        )
-                    elif "=" in designator and index_entry == 0:
-                        # mate two connectors as a whole
-                        harness.add_mate_component(from_name, to_name, designator)
+                        if "-" in designator:  # mate pin by pin
+                            harness.add_mate_pin(
+                                from_name, from_pin, to_name, to_pin, designator
+                            )
+                        elif "=" in designator and index_entry == 0:
+                            # mate two connectors as a whole
+                            harness.add_mate_component(from_name, to_name, designator)
 
     # warn about unused templates
 
@@ -417,6 +452,7 @@ def _get_yaml_data_and_path(inp: Union[str, Path, Dict]) -> (Dict, Path):
             # instead in some cases (depending on the Python version).
             # Catch these specific errors, but raise any others.
 
+            import platform
             from errno import EINVAL, ENAMETOOLONG
 
             if type(e) is OSError and e.errno not in (EINVAL, ENAMETOOLONG, None):
@@ -427,7 +463,7 @@ def _get_yaml_data_and_path(inp: Union[str, Path, Dict]) -> (Dict, Path):
             # file does not exist; assume inp is a YAML string
             yaml_str = inp
             yaml_path = None
-        yaml_data = yaml.safe_load(yaml_str)
+        yaml_data = load_yaml(yaml_str)
     else:
         # received a Dict, use as-is
         yaml_data = inp
@@ -435,6 +471,160 @@ def _get_yaml_data_and_path(inp: Union[str, Path, Dict]) -> (Dict, Path):
     return yaml_data, yaml_path
 
 
+# Use the much faster LibYAML based loader when PyYAML has been built with it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_yaml_cache = OrderedDict()  # pickled documents by hash of the YAML string
+_yaml_cache_size = 0  # max. number of cached documents, 0 to disable caching
+
+
+def set_yaml_cache_size(size: int) -> None:
+    """Set the number of parsed YAML documents to keep in memory (0 = no caching).
+
+    Caching is useful in long-running processes parsing the same input repeatedly.
+    """
+    global _yaml_cache_size
+    _yaml_cache_size = size
+    while len(_yaml_cache) > size:
+        _yaml_cache.popitem(last=False)
+
+
+def load_yaml(yaml_str: str) -> Any:
+    """Return the data of a YAML document, using the document cache if enabled."""
+    if not _yaml_cache_size:
+        return yaml.load(yaml_str, Loader=YamlLoader)
+    import hashlib
+
+    key = hashlib.sha256(yaml_str.encode("utf-8")).digest()
+    if key in _yaml_cache:
+        _yaml_cache.move_to_end(key)
+    else:
+        _yaml_cache[key] = pickle.dumps(yaml.load(yaml_str, Loader=YamlLoader))
+        if len(_yaml_cache) > _yaml_cache_size:
+            _yaml_cache.popitem(last=False)
+    # parse() modifies the data, so every caller gets its own copy
+    return pickle.loads(_yaml_cache[key])
+
+
+class Prepend:
+    """YAML data prepended to each input file of a batch, parsed only once.
+
+    The connector and cable templates of the prepended files are validated once,
+    and merged into the templates of each input file. The validated templates
+    are passed to parse() (see templates()), which copies them for each instance.
+    Any other top-level item of an input file replaces the prepended one.
+    """
+
+    def __init__(self, files: List[Union[str, Path]] = []):
+        self.files = [Path(file) for file in files]
+        self.text = "".join(file_read_text(file) + "\n" for file in self.files)
+        data = load_yaml(self.text) if self.text else {}
+        if not isinstance(data, dict):
+            raise TypeError(
+                f"Expected a dict as top-level YAML input, but got: {type(data)}"
+            )
+        # resolve relative image paths from the prepended files' directories
+        image_paths = [file.parent for file in self.files]
+        self._unresolved = set()  # (section, template) with images of other paths
+        for sec in ("connectors", "cables"):
+            for key, attribs in _section_templates(data, sec).items():
+                image = attribs.get("image") if isinstance(attribs, dict) else None
+                if isinstance(image, dict) and image.get("src"):
+                    try:
+                        image["src"] = smart_file_resolve(image["src"], image_paths)
+                    except FileNotFoundError:
+                        # resolved relative to each input file in parse() instead
+                        self._unresolved.add((sec, key))
+        self._data = pickle.dumps(data)
+        self.validate()
+
+    def validate(self) -> None:
+        """Raise an exception if any connector or cable template is invalid,
+        and keep the valid ones for templates().
+
+        Templates with images not found relative to the prepended files
+        are not validated here.
+        """
+        data = self.data()  # a copy, since components modify their arguments
+        unmodified = self.data()  # to find the templates an input file redefines
+        self._template_attribs = {
+            sec: _section_templates(unmodified, sec) for sec in ("connectors", "cables")
+        }
+        self._templates = {}
+        harness = Harness(metadata=Metadata(), options=Options(), tweak=Tweak())
+        for sec, add, components in (
+            ("connectors", harness.add_connector, harness.connectors),
+            ("cables", harness.add_cable, harness.cables),
+        ):
+            self._templates[sec] = {}
+            for key, attribs in _section_templates(data, sec).items():
+                if (sec, key) in self._unresolved:
+                    continue  # validated by parse(), when its image is found
+                try:
+                    add(name=key, **(attribs or {}))
+                except Exception as error:
+                    files = ", ".join(str(file) for file in self.files)
+                    raise Exception(
+                        f"Invalid template {key} in {files}: {error}"
+                    ) from error
+                self._templates[sec][key] = components[key]
+
+    def templates(
+        self, yaml_data: Union[str, Dict]
+    ) -> Dict[str, Union[Connector, Cable]]:
+        """Return the validated templates that are used unchanged in yaml_data,
+        as returned by apply(), to be passed to parse()."""
+        if not isinstance(yaml_data, dict):
+            return {}
+        templates = {}
+        for sec, section_templates in self._templates.items():
+            input_attribs = _section_templates(yaml_data, sec)
+            for key, component in section_templates.items():
+                if input_attribs.get(key) == self._template_attribs[sec][key]:
+                    templates[key] = component
+        return templates
+
+    def data(self) -> Dict:
+        """Return a new copy of the prepended YAML data."""
+        return pickle.loads(self._data)
+
+    def apply(self, yaml_input: str) -> Union[str, Dict]:
+        """Return the input YAML string merged with the prepended data, for parse()."""
+        if not self.files:
+            return yaml_input
+        try:
+            yaml_data = load_yaml(yaml_input)
+        except yaml.composer.ComposerError:
+            # most likely an alias of an anchor in the prepended text,
+            # which can only be resolved when parsing the joined text
+            yaml_data = load_yaml(self.text + yaml_input)
+        if not isinstance(yaml_data, dict):
+            return self.text + yaml_input  # let parse() report the error
+        data = self.data()
+        for key, value in yaml_data.items():
+            if key in ("connectors", "cables") and isinstance(value, dict):
+                data[key] = {**_section_templates(data, key), **value}
+            else:
+                data[key] = value
+        return data
+
+
+def _section_templates(yaml_data: Dict, sec: str) -> Dict:
+    """Return the templates in a connectors or cables section, if any."""
+    templates = yaml_data.get(sec)
+    return templates if isinstance(templates, dict) else {}
+
+
+def read_prepend(prepend: List[Union[str, Path]]) -> Prepend:
+    """Return the parsed data of the files to prepend to each input file."""
+    for prepend_file in prepend:
+        prepend_file = Path(prepend_file)
+        if not prepend_file.exists():
+            raise Exception(f"File does not exist:\n{prepend_file}")
+        print("Prepend file:", prepend_file)
+    return Prepend(prepend)
+
+
 def _get_output_dir(input_file: Path, default_output_dir: Path) -> Path:
     if default_output_dir:  # user-specified output directory
         output_dir = Path(default_output_dir)
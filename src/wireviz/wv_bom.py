@@ -1,22 +1,24 @@
 # -*- coding: utf-8 -*-
 
-from dataclasses import asdict
-from itertools import groupby
-from typing import Any, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 from wireviz.DataClasses import AdditionalComponent, Cable, Color, Connector
 from wireviz.wv_colors import translate_color
 from wireviz.wv_gv_html import html_bgcolor_attr, html_line_breaks
-from wireviz.wv_helper import clean_whitespace
+from wireviz.wv_helper import clean_whitespace, remove_links
 
 BOM_COLUMNS_ALWAYS = ("id", "description", "qty", "unit", "designators")
 BOM_COLUMNS_OPTIONAL = ("pn", "manufacturer", "mpn", "supplier", "spn")
 BOM_COLUMNS_IN_KEY = ("description", "unit") + BOM_COLUMNS_OPTIONAL
+BOM_COLUMNS_PROJECT = ("harnesses",)  # only in BOMs merged by merge_boms()
 
 HEADER_PN = "P/N"
 HEADER_MPN = "MPN"
 HEADER_SPN = "SPN"
 
+BOM_FILE_FORMATS = ("tsv", "csv", "jsonl")
+
 BOMKey = Tuple[str, ...]
 BOMColumn = str  # = Literal[*BOM_COLUMNS_ALWAYS, *BOM_COLUMNS_OPTIONAL]
 BOMEntry = Dict[BOMColumn, Union[str, int, float, List[str], None]]
@@ -24,8 +26,7 @@ BOMEntry = Dict[BOMColumn, Union[str, int, float, List[str], None]]
 
 def optional_fields(part: Union[Connector, Cable, AdditionalComponent]) -> BOMEntry:
     """Return part field values for the optional BOM columns as a dict."""
-    part = asdict(part)
-    return {field: part.get(field) for field in BOM_COLUMNS_OPTIONAL}
+    return {field: getattr(part, field, None) for field in BOM_COLUMNS_OPTIONAL}
 
 
 def get_additional_component_table(
@@ -48,8 +49,14 @@ def get_additional_component_table(
             }
             if harness.options.mini_bom_mode:
                 id = get_bom_index(
-                    harness.bom(),
-                    bom_entry_key({**asdict(part), "description": part.description}),
+                    harness.bom_ids(),
+                    bom_entry_key(
+                        {
+                            "description": part.description,
+                            "unit": part.unit,
+                            **optional_fields(part),
+                        }
+                    ),
                 )
                 rows.append(
                     component_table_entry(
@@ -89,12 +96,17 @@ def get_additional_component_bom(component: Union[Connector, Cable]) -> List[BOM
 def bom_entry_key(entry: BOMEntry) -> BOMKey:
     """Return a tuple of string values from the dict that must be equal to join BOM entries."""
     if "key" not in entry:
-        entry["key"] = tuple(
-            clean_whitespace(make_str(entry.get(c))) for c in BOM_COLUMNS_IN_KEY
-        )
+        entry["key"] = tuple(key_str(entry.get(c)) for c in BOM_COLUMNS_IN_KEY)
     return entry["key"]
 
 
+def key_str(value: Any) -> str:
+    """Return the value as a string with cleaned whitespace, for use in a BOM key."""
+    if value is None:
+        return ""
+    return clean_whitespace(value if isinstance(value, str) else make_str(value))
+
+
 def generate_bom(harness: "Harness") -> List[BOMEntry]:
     """Return a list of BOM entries generated from the harness."""
     from wireviz.Harness import Harness  # Local import to avoid circular imports
@@ -158,6 +170,7 @@ def generate_bom(harness: "Harness") -> List[BOMEntry]:
                 )
             else:
                 # add each wire from the bundle to the bom
+                fields = optional_fields(cable)
                 for index, color in enumerate(cable.colors):
                     description = (
                         "Wire"
@@ -175,10 +188,7 @@ def generate_bom(harness: "Harness") -> List[BOMEntry]:
                             "qty": cable.length,
                             "unit": cable.length_unit,
                             "designators": cable.name if cable.show_name else None,
-                            **{
-                                k: index_if_list(v, index)
-                                for k, v in optional_fields(cable).items()
-                            },
+                            **{k: index_if_list(v, index) for k, v in fields.items()},
                         }
                     )
 
@@ -186,47 +196,103 @@ def generate_bom(harness: "Harness") -> List[BOMEntry]:
         bom_entries.extend(get_additional_component_bom(cable))
 
     # add harness aditional components to bom directly, as they both are List[BOMEntry]
-    bom_entries.extend(harness.additional_bom_items)
+    # (copied, since the entries are modified below)
+    bom_entries.extend(dict(item) for item in harness.additional_bom_items)
+
+    # deduplicate bom in one pass, keeping the first seen entry of each key
+    bom = {}
+    for entry in bom_entries:
+        # remove line breaks if present and cleanup any resulting whitespace issues
+        for k, v in entry.items():
+            if isinstance(v, str):
+                entry[k] = clean_whitespace(v)
+        key = bom_entry_key(entry)
+        qty = entry.get("qty", 1)
+        designators = make_list(entry.get("designators"))
+        if key in bom:
+            bom[key]["qty"] += qty
+            bom[key]["designators"].extend(designators)
+        else:
+            bom[key] = {**entry, "qty": qty, "designators": list(designators)}
+
+    # sort the entries by key, and add an incrementing id to each bom entry
+    return [
+        {
+            **entry,
+            "qty": round_qty(entry["qty"]),
+            "designators": sorted(set(entry["designators"])),
+            "id": index,
+        }
+        for index, entry in enumerate(sorted(bom.values(), key=bom_entry_key), 1)
+    ]
+
 
-    # remove line breaks if present and cleanup any resulting whitespace issues
-    bom_entries = [
-        {k: clean_whitespace(v) for k, v in entry.items()} for entry in bom_entries
+def merge_boms(boms: Dict[str, List[BOMEntry]]) -> List[BOMEntry]:
+    """Return one BOM with the entries of several harness BOMs joined by their key.
+
+    Args:
+        boms: The BOM of each harness (see generate_bom()) by harness name.
+
+    Returns:
+        The merged BOM entries, where the quantities are added up,
+        each designator is prefixed with the harness name, e.g. "main:X1",
+        and the harnesses column lists the quantity in each harness.
+    """
+    merged = {}
+    for name, bom in boms.items():
+        for entry in bom:
+            key = bom_entry_key(entry)
+            designators = [f"{name}:{d}" for d in make_list(entry.get("designators"))]
+            harness_qty = f"{name}: {entry['qty']}"
+            if key in merged:
+                merged[key]["qty"] += entry["qty"]
+                merged[key]["designators"].extend(designators)
+                merged[key]["harnesses"].append(harness_qty)
+            else:
+                merged[key] = {
+                    **entry,
+                    "designators": designators,
+                    "harnesses": [harness_qty],
+                }
+    return [
+        {
+            **entry,
+            "qty": round_qty(entry["qty"]),
+            "designators": sorted(set(entry["designators"])),
+            "id": index,
+        }
+        for index, entry in enumerate(sorted(merged.values(), key=bom_entry_key), 1)
     ]
 
-    # deduplicate bom
-    bom = []
-    for _, group in groupby(sorted(bom_entries, key=bom_entry_key), key=bom_entry_key):
-        group_entries = list(group)
-        designators = sum(
-            (make_list(entry.get("designators")) for entry in group_entries), []
-        )
-        total_qty = sum(entry.get("qty", 1) for entry in group_entries)
-        bom.append(
-            {
-                **group_entries[0],
-                "qty": int(total_qty)
-                if float(total_qty).is_integer()
-                else round(total_qty, 3),
-                "designators": sorted(set(designators)),
-            }
-        )
 
-    # add an incrementing id to each bom entry
-    return [{**entry, "id": index} for index, entry in enumerate(bom, 1)]
+def round_qty(qty: Union[int, float]) -> Union[int, float]:
+    """Return the quantity as an int if it is a whole number, or rounded otherwise."""
+    return int(qty) if float(qty).is_integer() else round(qty, 3)
+
+
+def get_bom_ids(bom: List[BOMEntry]) -> Dict[BOMKey, int]:
+    """Return a dict mapping the key of each BOM entry to its id."""
+    return {bom_entry_key(entry): entry["id"] for entry in bom}
 
 
-def get_bom_index(bom: List[BOMEntry], target: BOMKey) -> int:
+def get_bom_index(bom_ids: Dict[BOMKey, int], target: BOMKey) -> int:
     """Return id of BOM entry or raise exception if not found."""
-    for entry in bom:
-        if bom_entry_key(entry) == target:
-            return entry["id"]
-    raise Exception("Internal error: No BOM entry found matching: " + "|".join(target))
+    if target not in bom_ids:
+        raise Exception(
+            "Internal error: No BOM entry found matching: " + "|".join(target)
+        )
+    return bom_ids[target]
 
 
 def bom_list(bom: List[BOMEntry]) -> List[List[str]]:
     """Return list of BOM rows as lists of column strings with headings in top row."""
+    return list(bom_rows(bom))
+
+
+def bom_rows(bom: List[BOMEntry]) -> Iterator[List[str]]:
+    """Yield the BOM rows as lists of column strings, starting with the headings."""
     keys = list(BOM_COLUMNS_ALWAYS)  # Always include this fixed set of BOM columns.
-    for fieldname in BOM_COLUMNS_OPTIONAL:
+    for fieldname in BOM_COLUMNS_OPTIONAL + BOM_COLUMNS_PROJECT:
         # Include only those optional BOM columns that are in use.
         if any(entry.get(fieldname) for entry in bom):
             keys.append(fieldname)
@@ -237,11 +303,55 @@ def bom_list(bom: List[BOMEntry]) -> List[List[str]]:
         "mpn": HEADER_MPN,
         "spn": HEADER_SPN,
     }
-    return [
-        [bom_headings.get(k, k.capitalize()) for k in keys]
-    ] + [  # Create header row with key names
-        [make_str(entry.get(k)) for k in keys] for entry in bom
-    ]  # Create string list for each entry row
+    yield [bom_headings.get(k, k.capitalize()) for k in keys]  # header row
+    for entry in bom:
+        yield [make_str(entry.get(k)) for k in keys]  # string list for each entry
+
+
+def write_bom(rows: Iterable[List[str]], file: TextIO, fmt: str) -> None:
+    """Write the BOM rows to a text file, one row at a time.
+
+    Args:
+        rows: The BOM rows, with the headings in the first row (see bom_rows()).
+        file: The file to write to. For CSV, it must be opened with newline="".
+        fmt: One of BOM_FILE_FORMATS:
+            "tsv" for tab-separated values,
+            "csv" for comma-separated values (quoted where needed),
+            "jsonl" for JSON Lines, with one object per entry keyed by the headings,
+            and the Id and Qty values as numbers.
+    """
+    rows = ([remove_links(item) for item in row] for row in rows)
+    if fmt == "tsv":
+        for row in rows:
+            file.write("\t".join(row) + "\n")
+    elif fmt == "csv":
+        import csv
+
+        csv.writer(file).writerows(rows)
+    elif fmt == "jsonl":
+        import json
+
+        headings = next(rows)
+        # emit the numeric columns as JSON numbers instead of strings
+        numeric = {"Id": int, "Qty": lambda value: round_qty(float(value))}
+        for row in rows:
+            entry = dict(zip(headings, row))
+            for heading, convert in numeric.items():
+                if entry.get(heading):
+                    entry[heading] = convert(entry[heading])
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    else:
+        raise ValueError(f"Unknown BOM file format: {fmt}")
+
+
+def write_bom_file(
+    bom: List[BOMEntry], filename: Union[str, Path], fmt: str = "tsv"
+) -> None:
+    """Write the BOM to a file in one of BOM_FILE_FORMATS (see write_bom())."""
+    with open(
+        filename, "w", encoding="utf-8", newline="" if fmt == "csv" else None
+    ) as file:
+        write_bom(bom_rows(bom), file, fmt)
 
 
 def component_table_entry(
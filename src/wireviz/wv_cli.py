@@ -2,23 +2,32 @@
 
 import os
 import sys
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import click
 
 if __name__ == "__main__":
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import wireviz.wireviz as wv
 from wireviz import APP_NAME, __version__
-from wireviz.wv_helper import file_read_text
+
+# The modules doing the actual work (and their dependencies, such as yaml and
+# graphviz) are imported where they are needed, to keep the startup fast.
+if TYPE_CHECKING:
+    import wireviz.wireviz as wv
+    from wireviz.Harness import Harness
+
+WATCH_INTERVAL = 0.5  # seconds between polling watched files for changes
 
 format_codes = {
-    # "c": "csv",
+    "c": "csv",
     "g": "gv",
     "h": "html",
+    "j": "jsonl",
     "p": "png",
-    # "P": "pdf",
+    "P": "pdf",
     "s": "svg",
     "t": "tsv",
 }
@@ -64,6 +73,46 @@ epilog += ", ".join([f"{key} ({value.upper()})" for key, value in format_codes.i
     type=str,
     help="File name (without extension) to use for output files, if different from input file name.",
 )
+@click.option(
+    "-c",
+    "--cache-dir",
+    default=None,
+    type=Path,
+    help="Directory to cache rendered diagrams in, to skip Graphviz for unchanged inputs.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="Number of input files to process in parallel (0 = number of CPUs).",
+)
+@click.option(
+    "-w",
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Keep running and rebuild the outputs when any input file changes.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print the time spent in each processing stage (files are built one at a time).",
+)
+@click.option(
+    "--profile-output",
+    default=None,
+    type=Path,
+    help="Write the profile to a JSON file, or a Prometheus text file if named *.prom.",
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    default=False,
+    help="Also profile the peak memory allocated in each stage (slower).",
+)
 @click.option(
     "-V",
     "--version",
@@ -71,7 +120,20 @@ epilog += ", ".join([f"{key} ({value.upper()})" for key, value in format_codes.i
     default=False,
     help=f"Output {APP_NAME} version and exit.",
 )
-def wireviz(file, format, prepend, output_dir, output_name, version):
+def wireviz(
+    file,
+    format,
+    prepend,
+    output_dir,
+    output_name,
+    cache_dir,
+    jobs,
+    watch,
+    profile,
+    profile_output,
+    profile_memory,
+    version,
+):
     """
     Parses the provided FILE and generates the specified outputs.
     """
@@ -96,57 +158,263 @@ def wireviz(file, format, prepend, output_dir, output_name, version):
         else:
             raise Exception(f"Unknown output format: {code}")
     output_formats = tuple(sorted(set(output_formats)))
+
+    # check prepend file
+    from wireviz.wireviz import read_prepend
+
+    prepend = read_prepend(prepend)
+
+    if cache_dir:
+        from wireviz.wv_render import RenderCache, set_render_cache
+
+        render_cache = RenderCache(cache_dir)
+        set_render_cache(render_cache)
+        print("Cache dir:   ", cache_dir)
+
+    profiler = None
+    if profile or profile_output or profile_memory:
+        from wireviz.wv_profile import Profiler
+
+        profiler = Profiler(trace_memory=profile_memory)
+        profiler.start()
+
+    # run WireViz on each input file
+    filepaths = [Path(file) for file in filepaths]
+    for file in filepaths:
+        if not file.exists():
+            raise Exception(f"File does not exist:\n{file}")
+    build_args = [(file, output_formats, output_dir, output_name) for file in filepaths]
+    failed = []
+
+    if watch:
+        watch_files(filepaths, output_formats, output_dir, output_name, prepend)
+    elif jobs == 1 or len(filepaths) < 2 or profiler:
+        import traceback
+
+        # like the parallel build below, a failed file does not stop the others
+        for args in build_args:
+            try:
+                build_file(*args, prepend)
+            except Exception:
+                print(f"Error in {args[0]}:\n{traceback.format_exc()}")
+                failed.append(args[0])
+    else:
+        # schedule the largest files first to avoid one large file being started last
+        build_args.sort(key=lambda args: args[0].stat().st_size, reverse=True)
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(
+            max_workers=jobs or None,
+            initializer=_init_worker,
+            initargs=(cache_dir, prepend),
+        ) as executor:
+            futures = {
+                executor.submit(_build_job, args): args[0] for args in build_args
+            }
+            for future in as_completed(futures):
+                output, error, hits, misses = future.result()
+                print(output, end="")  # in one piece, not interleaved with others
+                if error:
+                    print(f"Error in {futures[future]}:\n{error}")
+                    failed.append(futures[future])
+                if cache_dir:
+                    render_cache.hits += hits
+                    render_cache.misses += misses
+
+    if cache_dir:
+        print("Render cache:", render_cache)
+    if profiler:
+        profiler.stop()
+        if profile_output:
+            if profile_output.suffix == ".prom":
+                profiler.write_prometheus(profile_output)
+            else:
+                profiler.write_json(profile_output)
+            print("Profile:     ", profile_output)
+        if profile or not profile_output:
+            print()
+            profiler.print_report()
+    print()
+
+    if failed:
+        print(f"{len(failed)} of {len(filepaths)} files failed:")
+        for file in failed:
+            print("  ", file)
+        sys.exit(1)
+
+
+def build_file(
+    file: Path,
+    output_formats: Tuple[str, ...],
+    output_dir: Optional[Path],
+    output_name: Optional[str],
+    prepend: "wv.Prepend",
+) -> "Harness":
+    """Parse one input file, generate the specified outputs, and return the harness."""
+    import wireviz.wireviz as wv
+    from wireviz.wv_helper import file_read_text
+
+    output_file = _output_file(file, output_dir, output_name)
     output_formats_str = (
         f'[{"|".join(output_formats)}]'
         if len(output_formats) > 1
         else output_formats[0]
     )
 
-    # check prepend file
-    if len(prepend) > 0:
-        prepend_input = ""
-        for prepend_file in prepend:
-            prepend_file = Path(prepend_file)
-            if not prepend_file.exists():
-                raise Exception(f"File does not exist:\n{prepend_file}")
-            print("Prepend file:", prepend_file)
-
-            prepend_input += file_read_text(prepend_file) + "\n"
-    else:
-        prepend_input = ""
+    print("Input file:  ", file)
+    print("Output file: ", f"{output_file}.{output_formats_str}")
 
-    # run WireVIz on each input file
-    for file in filepaths:
-        file = Path(file)
-        if not file.exists():
-            raise Exception(f"File does not exist:\n{file}")
+    yaml_input = file_read_text(file)
+    file_dir = file.parent
 
-        # file_out = file.with_suffix("") if not output_file else output_file
-        _output_dir = file.parent if not output_dir else output_dir
-        _output_name = file.stem if not output_name else output_name
+    yaml_input = prepend.apply(yaml_input)
+    templates = prepend.templates(yaml_input)
+    image_paths = {file_dir}
+    for p in prepend.files:
+        image_paths.add(Path(p).parent)
 
-        print("Input file:  ", file)
-        print(
-            "Output file: ", f"{Path(_output_dir / _output_name)}.{output_formats_str}"
-        )
+    return wv.parse(
+        yaml_input,
+        return_types="harness",
+        output_formats=output_formats,
+        output_dir=output_file.parent,
+        output_name=output_file.name,
+        image_paths=list(image_paths),
+        templates=templates,
+    )
+
+
+def watch_files(
+    filepaths: List[Path],
+    output_formats: Tuple[str, ...],
+    output_dir: Optional[Path],
+    output_name: Optional[str],
+    prepend: "wv.Prepend",
+) -> None:
+    """Build the input files, then rebuild them whenever a file they use changes.
 
-        yaml_input = file_read_text(file)
-        file_dir = file.parent
+    The input files, prepend files, images and HTML templates are watched.
+    When only the HTML template of an input has changed,
+    the HTML output is regenerated from the harness of the previous build
+    instead of parsing the input again.
+    """
+    import traceback
+
+    import wireviz.wireviz as wv
+    from wireviz.wv_watch import FileWatcher, harness_dependencies
 
-        yaml_input = prepend_input + yaml_input
-        image_paths = {file_dir}
-        for p in prepend:
-            image_paths.add(Path(p).parent)
+    wv.set_yaml_cache_size(len(filepaths))  # inputs that did not change
+    watcher = FileWatcher()
+    harnesses = {}
+    dependencies = {}
 
-        wv.parse(
-            yaml_input,
-            output_formats=output_formats,
-            output_dir=_output_dir,
-            output_name=_output_name,
-            image_paths=list(image_paths),
+    def build(file: Path) -> None:
+        try:
+            harness = build_file(file, output_formats, output_dir, output_name, prepend)
+        except Exception:
+            traceback.print_exc()
+            harnesses.pop(file, None)
+            return
+        harnesses[file] = harness
+        dependencies[file].update(
+            harness_dependencies(
+                harness, _output_file(file, output_dir, output_name), output_formats
+            )
         )
+        watcher.watch(dependencies[file])  # watch any new images or templates
+
+    prepend_paths = {prepend_file.resolve() for prepend_file in prepend.files}
+    for file in filepaths:
+        dependencies[file] = {file.resolve(): "input"}
+        dependencies[file].update(dict.fromkeys(prepend_paths, "prepend"))
+        watcher.watch(dependencies[file])
+        build(file)
 
     print()
+    print("Watching for changes, press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            changed = watcher.changed()
+            if not changed:
+                continue
+            print()
+            for path in sorted(changed):
+                print("Changed:     ", path)
+            if changed & prepend_paths:
+                try:
+                    prepend = wv.read_prepend(prepend.files)
+                except Exception:
+                    traceback.print_exc()
+                    continue
+            for file in filepaths:
+                kinds = {
+                    kind for path, kind in dependencies[file].items() if path in changed
+                }
+                if not kinds:
+                    continue
+                if kinds == {"template"} and file in harnesses:
+                    # the harness is unchanged, only the HTML output is affected
+                    print("Input file:  ", file)
+                    try:
+                        harnesses[file].output(
+                            filename=_output_file(file, output_dir, output_name),
+                            fmt=("html",),
+                        )
+                    except Exception:
+                        traceback.print_exc()
+                else:
+                    build(file)
+    except KeyboardInterrupt:
+        pass
+
+
+def _output_file(
+    file: Path, output_dir: Optional[Path], output_name: Optional[str]
+) -> Path:
+    """Return the output file path (without extension) for an input file."""
+    return Path(output_dir or file.parent) / (output_name or file.stem)
+
+
+_worker_prepend = None  # prepended data of the batch in a worker process
+
+
+def _init_worker(cache_dir: Optional[Path], prepend: "wv.Prepend") -> None:
+    """Set up the render cache and prepended data in a parallel build worker."""
+    from wireviz.wv_render import RenderCache, set_render_cache
+
+    global _worker_prepend
+    _worker_prepend = prepend
+    if cache_dir:
+        set_render_cache(RenderCache(cache_dir))
+
+
+def _build_job(args: tuple) -> Tuple[str, Optional[str], int, int]:
+    """Run build_file() in a worker process.
+
+    Returns:
+        The output printed during the build, to be printed by the main process,
+        the traceback if the build failed (or None),
+        and the number of render cache hits and misses during the build.
+    """
+    import io
+    import traceback
+    from contextlib import redirect_stdout
+
+    from wireviz.wv_render import get_render_cache
+
+    cache = get_render_cache()
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            build_file(*args, _worker_prepend)
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+    if cache:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return output.getvalue(), error, hits, misses
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import re
+import struct
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 awg_equiv_table = {
     "0.09": "28",
@@ -91,13 +93,12 @@ def flatten2d(inp):
 
 
 def tuplelist2tsv(inp, header=None):
-    output = ""
     if header is not None:
         inp.insert(0, header)
     inp = flatten2d(inp)
-    for row in inp:
-        output = output + "\t".join(str(remove_links(item)) for item in row) + "\n"
-    return output
+    return "".join(
+        "\t".join(str(remove_links(item)) for item in row) + "\n" for row in inp
+    )
 
 
 def remove_links(inp):
@@ -155,18 +156,89 @@ def is_arrow(inp):
 
 def aspect_ratio(image_src):
     try:
-        from PIL import Image
-
-        with Image.open(image_src) as image:
-            if image.width > 0 and image.height > 0:
-                return image.width / image.height
-            print(f"aspect_ratio(): Invalid image size {image.width} x {image.height}")
+        width, height = image_size(image_src)
+        if width > 0 and height > 0:
+            return width / height
+        print(f"aspect_ratio(): Invalid image size {width} x {height}")
     # ModuleNotFoundError and FileNotFoundError are the most expected, but all are handled equally.
     except Exception as error:
         print(f"aspect_ratio(): {type(error).__name__}: {error}")
     return 1  # Assume 1:1 when unable to read actual image size
 
 
+def image_size(image_src) -> Tuple[float, float]:
+    """Return width and height of an image file, probing each file version only once."""
+    path = Path(image_src).resolve()
+    stat = path.stat()
+    return _image_size(path, stat.st_mtime_ns, stat.st_size)
+
+
+def clear_image_size_cache() -> None:
+    """Forget the image sizes read by image_size(), like Base64Cache.clear()."""
+    _image_size.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _image_size(path: Path, mtime_ns: int, size: int) -> Tuple[float, float]:
+    # mtime_ns and size are only part of the cache key to detect changed files
+    with open(path, "rb") as file:
+        header = file.read(64 * 1024)
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return struct.unpack(">II", header[16:24])  # IHDR chunk
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", header[6:10])  # logical screen descriptor
+    if header.startswith(b"\xff\xd8"):
+        return _jpeg_size(path)
+    if re.search(rb"<svg[\s>]", header):
+        return _svg_size(header.decode("utf-8", errors="replace"))
+    # fall back to Pillow for other image formats
+    from PIL import Image
+
+    with Image.open(path) as image:  # only the image header is read
+        return image.width, image.height
+
+
+# JPEG start-of-frame markers, which are followed by the image size
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7}
+JPEG_SOF_MARKERS |= {0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(path: Path) -> Tuple[int, int]:
+    """Return width and height from the first start-of-frame marker of a JPEG file."""
+    with open(path, "rb") as file:
+        file.read(2)  # SOI marker
+        while True:
+            marker = file.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                raise ValueError(f"Invalid JPEG marker in {path}")
+            while marker[1] == 0xFF:  # skip fill bytes
+                marker = marker[1:] + file.read(1)
+            (length,) = struct.unpack(">H", file.read(2))
+            if marker[1] in JPEG_SOF_MARKERS:
+                height, width = struct.unpack(">xHH", file.read(5))
+                return width, height
+            file.seek(length - 2, 1)  # skip segment
+
+
+def _svg_size(header: str) -> Tuple[float, float]:
+    """Return width and height from the attributes of the root element of a SVG file."""
+    tag = re.search(r"<svg\s[^>]*>", header)
+    if not tag:
+        raise ValueError("No <svg> element found")
+    attrs = dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag[0]))
+    # width and height in the same absolute unit (or none), e.g. "210mm"
+    sizes = [
+        re.fullmatch(r"\s*([\d.]+)\s*(px|pt|pc|mm|cm|in)?\s*", attrs.get(a, ""))
+        for a in ("width", "height")
+    ]
+    if all(sizes) and sizes[0][2] == sizes[1][2]:
+        return float(sizes[0][1]), float(sizes[1][1])
+    viewbox = re.split(r"[\s,]+", attrs.get("viewBox", "").strip())
+    if len(viewbox) == 4:
+        return float(viewbox[2]), float(viewbox[3])
+    raise ValueError("No SVG width and height or viewBox found")
+
+
 def smart_file_resolve(filename: str, possible_paths: (str, List[str])) -> Path:
     if not isinstance(possible_paths, List):
         possible_paths = [possible_paths]
@@ -175,7 +247,7 @@ def smart_file_resolve(filename: str, possible_paths: (str, List[str])) -> Path:
         if filename.exists():
             return filename
         else:
-            raise Exception(f"{filename} does not exist.")
+            raise FileNotFoundError(f"{filename} does not exist.")
     else:  # search all possible paths in decreasing order of precedence
         possible_paths = [
             Path(path).resolve() for path in possible_paths if path is not None
@@ -185,7 +257,7 @@ def smart_file_resolve(filename: str, possible_paths: (str, List[str])) -> Path:
             if resolved_path.exists():
                 return resolved_path
         else:
-            raise Exception(
+            raise FileNotFoundError(
                 f"{filename} was not found in any of the following locations: \n"
                 + "\n".join([str(x) for x in possible_paths])
             )
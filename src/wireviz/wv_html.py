@@ -2,7 +2,7 @@
 
 import re
 from pathlib import Path
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from wireviz import APP_NAME, APP_URL, __version__, wv_colors
 from wireviz.DataClasses import Metadata, Options
@@ -16,115 +16,221 @@ from wireviz.wv_helper import (
 )
 
 
-def generate_html_output(
-    filename: Union[str, Path],
-    bom_list: List[List[str]],
-    metadata: Metadata,
-    options: Options,
-):
-    # load HTML template
+def get_template_file(filename: Union[str, Path], metadata: Metadata) -> Path:
+    """Return the path of the HTML template to use for the output file."""
     templatename = metadata.get("template", {}).get("name")
     if templatename:
         # if relative path to template was provided, check directory of YAML file first, fall back to built-in template directory
-        templatefile = smart_file_resolve(
+        return smart_file_resolve(
             f"{templatename}.html",
             [Path(filename).parent, Path(__file__).parent / "templates"],
         )
     else:
         # fall back to built-in simple template if no template was provided
-        templatefile = Path(__file__).parent / "templates/simple.html"
+        return Path(__file__).parent / "templates/simple.html"
+
+
+class HTMLTemplate:
+    """HTML template compiled into a list of literal text and placeholder names.
+
+    A placeholder is written as <!-- %name% --> in the template.
+    """
+
+    placeholder_pattern = re.compile(r"<!-- %([^%]+)% -->")
+
+    def __init__(self, text: str):
+        # literal text at even indices, placeholder names at odd indices
+        self.segments = self.placeholder_pattern.split(text)
+        self.placeholders = set(self.segments[1::2])
+
+    def render(self, replacements: Dict[str, str]) -> str:
+        """Return the text with the placeholders replaced, except those
+        without replacement, which are kept as they are."""
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = (
+                replacements[name] if name in replacements else f"<!-- %{name}% -->"
+            )
+        return "".join(parts)
+
+
+# Compiled templates by path, with the modification time and size of their file
+_template_cache: Dict[Path, Tuple[Tuple[int, int], HTMLTemplate]] = {}
+
+
+def load_template(file: Union[str, Path]) -> HTMLTemplate:
+    """Return the compiled template file, compiled again only if the file changed."""
+    file = Path(file).resolve()
+    stat = file.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _template_cache.get(file)
+    if cached and cached[0] == key:
+        return cached[1]
+    # TODO?: Warn if unexpected meta charset?
+    template = HTMLTemplate(file_read_text(file))
+    _template_cache[file] = (key, template)
+    return template
+
+
+def bom_html_table(bom: List[List[str]], reverse: bool = False) -> str:
+    """Return the BOM (header and rows of strings) as HTML table,
+    with the header at the top, or reversed with the header at the bottom."""
+    column_classes = [f"bom_col_{item.lower()}" for item in bom[0]]
+
+    def row_html(tag: str, row: List[str]) -> str:
+        cells = "".join(
+            f'    <{tag} class="{column_class}">{item}</{tag}>\n'
+            for column_class, item in zip(column_classes, row)
+        )
+        return f"  <tr>\n{cells}  </tr>\n"
+
+    rows = [row_html("td", row) for row in bom[1:]]
+    if reverse:
+        rows.reverse()
+        rows.append(row_html("th", bom[0]))
+    else:
+        rows.insert(0, row_html("th", bom[0]))
+    return f'<table class="bom">\n{"".join(rows)}</table>\n'
+
+
+# Shows the BOM data of the enclosing element as table in pages
+BOM_PAGING_SCRIPT = """(function () {
+  var box = document.currentScript.parentNode;
+  var bom = JSON.parse(box.querySelector("script[type='application/json']").text);
+  var table = box.querySelector("table.bom");
+  var pages = Math.max(1, Math.ceil(bom.rows.length / bom.page_size));
+  var page = 0;
+  function rowElement(tag, row) {
+    var tr = document.createElement("tr");
+    row.forEach(function (item, i) {
+      var cell = document.createElement(tag);
+      cell.className = "bom_col_" + bom.columns[i].toLowerCase();
+      cell.innerHTML = item;
+      tr.appendChild(cell);
+    });
+    return tr;
+  }
+  function show(p) {
+    page = Math.max(0, Math.min(pages - 1, p));
+    var start = page * bom.page_size;
+    var rows = bom.rows.slice(start, start + bom.page_size).map(function (row) {
+      return rowElement("td", row);
+    });
+    if (bom.reverse) {
+      rows.reverse();
+      rows.push(rowElement("th", bom.columns));
+    } else {
+      rows.unshift(rowElement("th", bom.columns));
+    }
+    table.textContent = "";
+    rows.forEach(function (tr) { table.appendChild(tr); });
+    box.querySelector(".bom_page").textContent = "Page " + (page + 1) + " of " + pages;
+  }
+  box.querySelector(".bom_previous").onclick = function () { show(page - 1); };
+  box.querySelector(".bom_next").onclick = function () { show(page + 1); };
+  show(0);
+})();
+"""
+
+
+def bom_html_paged(bom: List[List[str]], page_size: int, reverse: bool = False) -> str:
+    """Return the BOM as compact JSON with a script that shows it as HTML table
+    (see bom_html_table()) in pages of page_size rows, to keep large BOMs small."""
+    import json
+
+    data = {
+        "columns": bom[0],
+        "rows": bom[1:],
+        "page_size": page_size,
+        "reverse": reverse,
+    }
+    # escape "<" within strings, which could end the script element
+    data_json = json.dumps(data, separators=(",", ":")).replace("<", "\\u003c")
+    return (
+        '<div class="bom_paged">\n'
+        '<table class="bom"></table>\n'
+        '<div class="bom_pager">'
+        '<button type="button" class="bom_previous">&lt;</button> '
+        '<span class="bom_page"></span> '
+        '<button type="button" class="bom_next">&gt;</button>'
+        "</div>\n"
+        f'<script type="application/json">{data_json}</script>\n'
+        f"<script>\n{BOM_PAGING_SCRIPT}</script>\n"
+        "</div>\n"
+    )
+
+
+def generate_html_output(
+    filename: Union[str, Path],
+    bom_list: List[List[str]],
+    metadata: Metadata,
+    options: Options,
+    svg: Optional[str] = None,
+):
+    """Write the HTML output file {filename}.html.
 
-    html = file_read_text(templatefile)  # TODO?: Warn if unexpected meta charset?
+    The diagram is embedded from svg, or if not given, read from {filename}.svg.
+    """
+    # load HTML template
+    template = load_template(get_template_file(filename, metadata))
+    used = template.placeholders
 
     # embed SVG diagram (only if used)
     def svgdata() -> str:
         return re.sub(  # TODO?: Verify xml encoding="utf-8" in SVG?
             "^<[?]xml [^?>]*[?]>[^<]*<!DOCTYPE [^>]*>",
             "<!-- XML and DOCTYPE declarations from SVG file removed -->",
-            file_read_text(f"{filename}.tmp.svg"),
+            svg if svg is not None else file_read_text(f"{filename}.svg"),
             1,
         )
 
-    # generate BOM table
+    # generate BOM table (only the variants used by the template)
     bom = flatten2d(bom_list)
+    page_size = options.html_bom_page_size
 
-    # generate BOM header (may be at the top or bottom of the table)
-    bom_header_html = "  <tr>\n"
-    for item in bom[0]:
-        th_class = f"bom_col_{item.lower()}"
-        bom_header_html = f'{bom_header_html}    <th class="{th_class}">{item}</th>\n'
-    bom_header_html = f"{bom_header_html}  </tr>\n"
-
-    # generate BOM contents
-    bom_contents = []
-    for row in bom[1:]:
-        row_html = "  <tr>\n"
-        for i, item in enumerate(row):
-            td_class = f"bom_col_{bom[0][i].lower()}"
-            row_html = f'{row_html}    <td class="{td_class}">{item}</td>\n'
-        row_html = f"{row_html}  </tr>\n"
-        bom_contents.append(row_html)
-
-    bom_html = (
-        '<table class="bom">\n' + bom_header_html + "".join(bom_contents) + "</table>\n"
-    )
-    bom_html_reversed = (
-        '<table class="bom">\n'
-        + "".join(list(reversed(bom_contents)))
-        + bom_header_html
-        + "</table>\n"
-    )
+    def bom_table(reverse: bool) -> str:
+        if page_size and len(bom) - 1 > page_size:  # too large for a static table
+            return bom_html_paged(bom, page_size, reverse)
+        return bom_html_table(bom, reverse)
 
     # prepare simple replacements
     replacements = {
-        "<!-- %generator% -->": f"{APP_NAME} {__version__} - {APP_URL}",
-        "<!-- %fontname% -->": options.fontname,
-        "<!-- %bgcolor% -->": wv_colors.translate_color(options.bgcolor, "hex"),
-        "<!-- %filename% -->": str(filename),
-        "<!-- %filename_stem% -->": Path(filename).stem,
-        "<!-- %bom% -->": bom_html,
-        "<!-- %bom_reversed% -->": bom_html_reversed,
-        "<!-- %sheet_current% -->": "1",  # TODO: handle multi-page documents
-        "<!-- %sheet_total% -->": "1",  # TODO: handle multi-page documents
-        "<!-- %template_sheetsize% -->": metadata.get("template", {}).get(
-            "sheetsize", ""
-        ),
+        "generator": f"{APP_NAME} {__version__} - {APP_URL}",
+        "fontname": options.fontname,
+        "bgcolor": wv_colors.translate_color(options.bgcolor, "hex"),
+        "filename": str(filename),
+        "filename_stem": Path(filename).stem,
+        "sheet_current": "1",  # TODO: handle multi-page documents
+        "sheet_total": "1",  # TODO: handle multi-page documents
+        "template_sheetsize": metadata.get("template", {}).get("sheetsize", ""),
     }
 
     def replacement_if_used(key: str, func: Callable[[], str]) -> None:
         """Append replacement only if used in html."""
-        if key in html:
+        if key in used:
             replacements[key] = func()
 
-    replacement_if_used("<!-- %diagram% -->", svgdata)
-    replacement_if_used(
-        "<!-- %diagram_png_b64% -->", lambda: data_URI_base64(f"{filename}.png")
-    )
+    replacement_if_used("bom", lambda: bom_table(reverse=False))
+    replacement_if_used("bom_reversed", lambda: bom_table(reverse=True))
+    replacement_if_used("diagram", svgdata)
+    replacement_if_used("diagram_png_b64", lambda: data_URI_base64(f"{filename}.png"))
 
     # prepare metadata replacements
     if metadata:
         for item, contents in metadata.items():
             if isinstance(contents, (str, int, float)):
-                replacements[f"<!-- %{item}% -->"] = html_line_breaks(str(contents))
+                replacement_if_used(item, lambda: html_line_breaks(str(contents)))
             elif isinstance(contents, Dict):  # useful for authors, revisions
                 for index, (category, entry) in enumerate(contents.items()):
                     if isinstance(entry, Dict):
-                        replacements[f"<!-- %{item}_{index+1}% -->"] = str(category)
+                        replacement_if_used(f"{item}_{index+1}", lambda: str(category))
                         for entry_key, entry_value in entry.items():
-                            replacements[
-                                f"<!-- %{item}_{index+1}_{entry_key}% -->"
-                            ] = html_line_breaks(str(entry_value))
+                            replacement_if_used(
+                                f"{item}_{index+1}_{entry_key}",
+                                lambda: html_line_breaks(str(entry_value)),
+                            )
                     elif isinstance(entry, (str, int, float)):
-                        pass  # TODO?: replacements[f"<!-- %{item}_{category}% -->"] = html_line_breaks(str(entry))
-
-    # perform replacements
-    # regex replacement adapted from:
-    # https://gist.github.com/bgusach/a967e0587d6e01e889fd1d776c5f3729
-
-    # longer replacements first, just in case
-    replacements_sorted = sorted(replacements, key=len, reverse=True)
-    replacements_escaped = map(re.escape, replacements_sorted)
-    pattern = re.compile("|".join(replacements_escaped))
-    html = pattern.sub(lambda match: replacements[match.group(0)], html)
+                        pass  # TODO?: replacements[f"{item}_{category}"] = html_line_breaks(str(entry))
 
-    file_write_text(f"{filename}.html", html)
+    file_write_text(f"{filename}.html", template.render(replacements))
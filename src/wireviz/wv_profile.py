@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+
+@dataclass
+class StageStats:
+    name: str
+    wall_time: float = 0  # seconds
+    cpu_time: float = 0  # seconds of CPU time used by this process
+    memory_peak: Optional[int] = None  # bytes above the usage at the stage start
+    calls: int = 1
+
+
+_hooks: List = []
+_memory_peaks: List[List[int]] = []  # [usage at start, peak] of traced stages
+
+
+def add_hook(hook) -> None:
+    """Register a hook to be notified of each processing stage.
+
+    The hook must have a stage_start(name) and a stage_end(stats) method,
+    which are called at the start and the end of each stage.
+    Stages may be nested, e.g. "tweak" is a part of "create_graph".
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook) -> None:
+    _hooks.remove(hook)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Report the time and memory used by the enclosed processing stage to the hooks.
+
+    The peak memory usage is only measured while tracemalloc is tracing
+    (and with Python 3.9 or newer, which can reset the traced peak).
+    """
+    if not _hooks:  # nobody is listening, keep the overhead minimal
+        yield
+        return
+    for hook in _hooks:
+        hook.stage_start(name)
+    tracing = tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak")
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if _memory_peaks:  # the peak is reset, remember it for the enclosing stage
+            _memory_peaks[-1][1] = max(_memory_peaks[-1][1], peak)
+        tracemalloc.reset_peak()
+        _memory_peaks.append([current, current])
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        stats = StageStats(
+            name,
+            wall_time=time.perf_counter() - wall_start,
+            cpu_time=time.process_time() - cpu_start,
+        )
+        if tracing:
+            start, peak = _memory_peaks.pop()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            stats.memory_peak = peak - start
+        for hook in reversed(_hooks):
+            hook.stage_end(stats)
+
+
+class Profiler:
+    """Hook that sums up the statistics of all stages with the same name and parents.
+
+    The stages are keyed by their path, e.g. "create_graph/tweak",
+    in the order in which they were first seen.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._path: List[str] = []
+
+    def start(self) -> None:
+        """Start profiling, and tracing memory allocations if enabled."""
+        if self.trace_memory:
+            tracemalloc.start()
+        add_hook(self)
+
+    def stop(self) -> None:
+        remove_hook(self)
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    def stage_start(self, name: str) -> None:
+        self._path.append(name)
+        path = "/".join(self._path)
+        if path not in self.stages:  # list a stage before the stages within it
+            self.stages[path] = StageStats(path, calls=0)
+
+    def stage_end(self, stats: StageStats) -> None:
+        total = self.stages["/".join(self._path)]
+        self._path.pop()
+        total.wall_time += stats.wall_time
+        total.cpu_time += stats.cpu_time
+        total.calls += 1
+        if stats.memory_peak is not None:
+            total.memory_peak = max(total.memory_peak or 0, stats.memory_peak)
+
+    def report(self) -> Dict:
+        """Return the statistics of all stages, e.g. to be saved as JSON."""
+        return {"stages": [asdict(stats) for stats in self.stages.values()]}
+
+    def print_report(self) -> None:
+        print(f"{'Stage':<32}{'Calls':>8}{'Wall ms':>10}{'CPU ms':>10}{'Peak MiB':>10}")
+        for path, stats in self.stages.items():
+            depth = path.count("/")
+            name = "  " * depth + path.rsplit("/", 1)[-1]
+            peak = (
+                f"{stats.memory_peak / 1024 / 1024:10.2f}"
+                if stats.memory_peak is not None
+                else f"{'-':>10}"
+            )
+            print(
+                f"{name:<32}{stats.calls:>8}"
+                f"{stats.wall_time * 1000:10.1f}{stats.cpu_time * 1000:10.1f}{peak}"
+            )
+
+    def write_json(self, filename: Union[str, Path]) -> None:
+        import json
+
+        _write_atomic(filename, json.dumps(self.report(), indent=2) + "\n")
+
+    def write_prometheus(self, filename: Union[str, Path]) -> None:
+        """Write the statistics in the Prometheus text format.
+
+        The file is replaced atomically, as expected by the
+        textfile collector of the Prometheus node exporter.
+        """
+        metrics = [
+            ("wall_seconds", "Wall time spent in the stage.", "wall_time"),
+            ("cpu_seconds", "CPU time spent in the stage.", "cpu_time"),
+            ("calls", "Number of times the stage was run.", "calls"),
+            ("memory_peak_bytes", "Peak memory allocated in the stage.", "memory_peak"),
+        ]
+        lines = []
+        for metric, help, attr in metrics:
+            values = [
+                (path, getattr(stats, attr))
+                for path, stats in self.stages.items()
+                if getattr(stats, attr) is not None
+            ]
+            if not values:
+                continue
+            lines.append(f"# HELP wireviz_stage_{metric} {help}")
+            lines.append(f"# TYPE wireviz_stage_{metric} gauge")
+            for path, value in values:
+                label = path.replace("\\", r"\\").replace('"', r"\"")
+                lines.append(f'wireviz_stage_{metric}{{stage="{label}"}} {value}')
+        lines.append("# HELP wireviz_profile_timestamp_seconds Time of the report.")
+        lines.append("# TYPE wireviz_profile_timestamp_seconds gauge")
+        lines.append(f"wireviz_profile_timestamp_seconds {time.time()}")
+        _write_atomic(filename, "\n".join(lines) + "\n")
+
+
+def _write_atomic(filename: Union[str, Path], text: str) -> None:
+    path = Path(filename)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import click
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import wireviz.wireviz as wv
+from wireviz import APP_NAME, __version__
+from wireviz.wv_bom import BOM_FILE_FORMATS, BOMEntry, merge_boms, write_bom_file
+from wireviz.wv_helper import file_read_text
+
+_worker_prepend = None  # prepended data of the project in a worker process
+
+
+def harness_bom(file: Path, prepend: Optional[wv.Prepend] = None) -> List[BOMEntry]:
+    """Parse one input file and return its BOM, without creating the diagram."""
+    yaml_input = file_read_text(file)
+    image_paths = [file.parent]
+    templates = None
+    if prepend:
+        yaml_input = prepend.apply(yaml_input)
+        templates = prepend.templates(yaml_input)
+        image_paths.extend(p.parent for p in prepend.files)
+    harness = wv.parse(
+        yaml_input,
+        return_types="harness",
+        image_paths=image_paths,
+        templates=templates,
+    )
+    return harness.bom()
+
+
+def harness_names(files: List[Path]) -> List[str]:
+    """Return the file names without extension, or the paths where those are not unique."""
+    stems = [file.stem for file in files]
+    return [
+        file.stem if stems.count(file.stem) == 1 else str(file.with_suffix(""))
+        for file in files
+    ]
+
+
+def project_bom(
+    files: List[Path], prepend: Optional[wv.Prepend] = None, jobs: int = 0
+) -> List[BOMEntry]:
+    """Return one BOM merged from the BOMs of all input files.
+
+    The input files are parsed in parallel, but neither diagrams
+    are created nor is Graphviz run.
+
+    Args:
+        files: The YAML input files of the harnesses.
+        prepend: Data to prepend to each input file (see wireviz.Prepend).
+        jobs: Number of input files to parse in parallel (0 = number of CPUs).
+
+    Returns:
+        The merged BOM (see merge_boms()), where each harness is named
+        after its input file.
+    """
+    files = [Path(file) for file in files]
+    if jobs == 1 or len(files) < 2:
+        boms = [harness_bom(file, prepend) for file in files]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs or None,
+            initializer=_init_worker,
+            initargs=(prepend,),
+        ) as executor:
+            boms = list(executor.map(_harness_bom_job, files))
+    return merge_boms(dict(zip(harness_names(files), boms)))
+
+
+def _init_worker(prepend: Optional[wv.Prepend]) -> None:
+    global _worker_prepend
+    _worker_prepend = prepend
+
+
+def _harness_bom_job(file: Path) -> List[BOMEntry]:
+    try:
+        return harness_bom(file, _worker_prepend)
+    except Exception as error:
+        raise Exception(f"Error in {file}: {error}") from error
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@click.argument("file", nargs=-1, required=True, type=Path)
+@click.option(
+    "-o",
+    "--output",
+    required=True,
+    type=Path,
+    help=f"BOM file to write, the format is determined by the file extension "
+    f"({', '.join(f'.{fmt}' for fmt in BOM_FILE_FORMATS)}).",
+)
+@click.option(
+    "-p",
+    "--prepend",
+    default=[],
+    multiple=True,
+    type=Path,
+    help="YAML file to prepend to each input file (optional).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=0,
+    type=click.IntRange(min=0),
+    help="Number of input files to parse in parallel (0 = number of CPUs).",
+)
+def main(file, output, prepend, jobs):
+    """
+    Writes one BOM of all parts used in the harnesses of the provided FILEs,
+    without generating any diagrams.
+    """
+    print(f"{APP_NAME} {__version__}")
+    fmt = output.suffix.lstrip(".").lower()
+    if fmt not in BOM_FILE_FORMATS:
+        raise click.BadParameter(f"Unknown BOM file format: {output.suffix}")
+    for input_file in file:
+        if not input_file.exists():
+            raise Exception(f"File does not exist:\n{input_file}")
+    bom = project_bom(list(file), wv.read_prepend(prepend), jobs)
+    write_bom_file(bom, output, fmt)
+    print(f"{len(bom)} BOM entries of {len(file)} harnesses written to {output}")
+
+
+if __name__ == "__main__":
+    main()
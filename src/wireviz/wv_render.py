@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+if TYPE_CHECKING:
+    import graphviz  # imported when needed, to keep BOM-only runs fast
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024  # bytes
+
+
+class RenderCache:
+    """Content-addressed on-disk cache of rendered Graphviz output.
+
+    Entries are keyed on a hash of the DOT source, the output format,
+    the bytes of all images referenced by the source, and the Graphviz version.
+    The total size of the cache directory is bounded by evicting the
+    least recently used entries, where the file modification time is used
+    as access time so the cache may be shared between processes.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size: int = DEFAULT_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, graph: "graphviz.Graph", fmt: str) -> str:
+        """Return the cache key for rendering the graph in the given format."""
+        h = hashlib.sha256()
+        h.update(".".join(str(v) for v in graphviz_version()).encode("ascii"))
+        h.update(b"\0" + fmt.encode("ascii") + b"\0")
+        source = graph.source
+        h.update(source.encode(graph.encoding))
+        # Graphviz reads the referenced images when rendering raster formats
+        for src in sorted(set(re.findall(r'<img [^>]*src="([^"]*)"', source))):
+            h.update(b"\0" + src.encode("utf-8") + b"\0")
+            try:
+                h.update(Path(src).read_bytes())
+            except OSError:
+                pass  # Graphviz will report the missing image
+        return h.hexdigest()
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    def get(self, key: str, fmt: str) -> Optional[Path]:
+        """Return the path of a cached entry and mark it as recently used, or None."""
+        path = self._path(key, fmt)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, fmt: str, data: bytes) -> None:
+        """Store rendered data, then evict entries above the size limit."""
+        path = self._path(key, fmt)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)  # atomic, in case of concurrent writers
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_size."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue  # already evicted by another process
+            total -= size
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def set_render_cache(cache: Optional[RenderCache]) -> None:
+    """Set the render cache used by all Harness objects, or None to disable it."""
+    global _render_cache
+    _render_cache = cache
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Return the render cache in use, or None if caching is disabled."""
+    return _render_cache
+
+
+_render_timeout: Optional[float] = None
+
+
+def set_render_timeout(timeout: Optional[float]) -> None:
+    """Set the seconds after which Graphviz is killed, or None to wait indefinitely."""
+    global _render_timeout
+    _render_timeout = timeout
+
+
+@lru_cache(maxsize=None)
+def graphviz_version() -> tuple:
+    """Return the Graphviz version tuple, querying the executable only once."""
+    import graphviz
+
+    return graphviz.version()
+
+
+def render_formats(
+    graph: "graphviz.Graph", outputs: Dict[str, Optional[Union[str, Path]]]
+) -> Dict[str, bytes]:
+    """Render the graph into one file per format using a single Graphviz call.
+
+    Graphviz accepts several -T<format> -o<file> pairs in one invocation,
+    and then computes the layout only once for all of them.
+    Formats found in the render cache (if enabled) are copied instead.
+
+    Args:
+        graph: The Graphviz graph to render.
+        outputs: Mapping from output format (e.g. "png") to output file path,
+            or to None for (at most) one format that is returned instead.
+
+    Returns:
+        The rendered data of the format without output file path, if any.
+    """
+    if list(outputs.values()).count(None) > 1:
+        raise ValueError("Only one format can be rendered without output file")
+    cache = get_render_cache()
+    keys = {}
+    rendered = {}
+    if cache:
+        missing = {}
+        for fmt, path in outputs.items():
+            keys[fmt] = cache.key(graph, fmt)
+            cached = cache.get(keys[fmt], fmt)
+            if not cached:
+                missing[fmt] = path
+            elif path is None:
+                rendered[fmt] = cached.read_bytes()
+            else:
+                shutil.copyfile(cached, path)
+        outputs = missing
+    if not outputs:
+        return rendered
+    cmd = [graph.engine]
+    stdout_fmt = None
+    for fmt, path in outputs.items():
+        if path is None:
+            stdout_fmt = fmt
+        else:
+            cmd.extend([f"-T{fmt}", f"-o{path}"])
+    if stdout_fmt:
+        cmd.append(f"-T{stdout_fmt}")  # a last format without -o goes to stdout
+    data = _run(graph, cmd)
+    if stdout_fmt:
+        rendered[stdout_fmt] = data
+    if cache:
+        for fmt, path in outputs.items():
+            data = rendered[fmt] if path is None else Path(path).read_bytes()
+            cache.put(keys[fmt], fmt, data)
+    return rendered
+
+
+def pipe_format(graph: "graphviz.Graph", fmt: str) -> bytes:
+    """Return the graph rendered in the given format, using the render cache if enabled."""
+    cache = get_render_cache()
+    if cache:
+        key = cache.key(graph, fmt)
+        cached = cache.get(key, fmt)
+        if cached:
+            return cached.read_bytes()
+    data = _run(graph, [graph.engine, f"-T{fmt}"])
+    if cache:
+        cache.put(key, fmt, data)
+    return data
+
+
+def _run(graph: "graphviz.Graph", cmd: list) -> bytes:
+    """Run Graphviz with the graph source as input and return its output.
+
+    Raises subprocess.TimeoutExpired if Graphviz was killed after the
+    render timeout (see set_render_timeout()).
+    """
+    import graphviz
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            input=graph.source.encode(graph.encoding),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=_render_timeout,
+        )
+    except FileNotFoundError as error:
+        raise graphviz.ExecutableNotFound(cmd) from error
+    if proc.returncode:
+        raise graphviz.CalledProcessError(
+            proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+        )
+    if proc.stderr:
+        # Graphviz warnings are printed, but do not stop the rendering.
+        print(proc.stderr.decode(graph.encoding, errors="replace"), end="")
+    return proc.stdout
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import io
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import click
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import wireviz.wireviz as wv
+from wireviz import APP_NAME, __version__
+from wireviz.wv_bom import BOM_FILE_FORMATS, bom_rows, write_bom
+from wireviz.wv_helper import file_read_text
+from wireviz.wv_render import set_render_timeout
+
+HOST = "127.0.0.1"  # The service is never exposed beyond localhost
+MAX_REQUEST_SIZE = 16 * 1024 * 1024  # bytes
+CMD_OUTPUT_NAME = "wireviz"  # Name of temporary output files
+YAML_CACHE_SIZE = 64  # Parsed YAML documents kept by each worker process
+
+content_types = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "tsv": "text/tab-separated-values; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/jsonl; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+
+
+def render(yaml_input: str, fmt: str, image_paths: List[str]) -> bytes:
+    """Parse the YAML input and return the output in the requested format."""
+    if fmt == "png":
+        return wv.parse(yaml_input, return_types="png", image_paths=list(image_paths))
+    elif fmt == "svg":
+        svg = wv.parse(yaml_input, return_types="svg", image_paths=list(image_paths))
+        return svg.encode("utf-8")
+    elif fmt in BOM_FILE_FORMATS:
+        harness = wv.parse(
+            yaml_input, return_types="harness", image_paths=list(image_paths)
+        )
+        output = io.StringIO(newline="")
+        write_bom(bom_rows(harness.bom()), output, fmt)
+        return output.getvalue().encode("utf-8")
+    elif fmt == "html":
+        # the HTML output embeds the diagram, and is generated as a file
+        with tempfile.TemporaryDirectory() as output_dir:
+            wv.parse(
+                yaml_input,
+                output_formats=("html",),
+                output_dir=output_dir,
+                output_name=CMD_OUTPUT_NAME,
+                image_paths=list(image_paths),
+            )
+            html = file_read_text(Path(output_dir) / f"{CMD_OUTPUT_NAME}.html")
+        return html.encode("utf-8")
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+
+def _init_worker(timeout: float) -> None:
+    wv.set_yaml_cache_size(YAML_CACHE_SIZE)
+    # stop Graphviz of requests the client is no longer waiting for
+    set_render_timeout(timeout)
+
+
+class RenderService:
+    """Run render requests in a bounded pool of worker processes.
+
+    At most workers + queue_size requests are accepted at the same time,
+    and further requests are rejected to give clients backpressure.
+    Identical concurrent requests (same format and input) share one job.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout: float,
+        image_paths: List[str],
+    ):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(timeout,),
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.timeout = timeout
+        self.image_paths = image_paths
+        self.lock = threading.Lock()
+        self.pending: Dict[str, Future] = {}
+
+    def submit(self, yaml_input: str, fmt: str) -> Optional[Future]:
+        """Return the future of the rendering job, or None if the service is busy."""
+        key = hashlib.sha256(f"{fmt}\0{yaml_input}".encode("utf-8")).hexdigest()
+        with self.lock:
+            if key in self.pending:  # coalesce with an identical request
+                return self.pending[key]
+            if not self.slots.acquire(blocking=False):
+                return None
+            future = self.executor.submit(render, yaml_input, fmt, self.image_paths)
+            self.pending[key] = future
+
+        def done(future: Future) -> None:
+            with self.lock:
+                del self.pending[key]
+            self.slots.release()
+
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Handle POST /render?format=<format> with the YAML input as body."""
+
+    service: RenderService  # set by serve()
+    server_version = f"{APP_NAME}/{__version__}"
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self.respond(200, b"OK\n")
+        else:
+            self.respond(404, b"Not found\n")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.respond(404, b"Not found\n")
+            return
+        fmt = parse_qs(url.query).get("format", ["svg"])[0].lower()
+        if fmt not in content_types:
+            self.respond(400, f"Unknown output format: {fmt}\n".encode("utf-8"))
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+        except (KeyError, TypeError, ValueError):
+            length = -1
+        if length < 0:
+            self.respond(400, b"Missing or invalid Content-Length\n")
+            return
+        if length > MAX_REQUEST_SIZE:
+            self.respond(413, b"Request too large\n")
+            return
+        try:
+            yaml_input = self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError:
+            self.respond(400, b"Request body is not valid UTF-8\n")
+            return
+
+        future = self.service.submit(yaml_input, fmt)
+        if future is None:
+            self.respond(503, b"Busy, please retry\n", {"Retry-After": "1"})
+            return
+        try:
+            data = future.result(timeout=self.service.timeout)
+        except FutureTimeoutError:
+            self.respond(504, b"Rendering timed out\n")
+        except Exception:
+            self.respond(422, traceback.format_exc().encode("utf-8"))
+        else:
+            self.respond(200, data, {"Content-Type": content_types[fmt]})
+
+    def respond(
+        self, code: int, data: bytes, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.send_response(code)
+        headers = {"Content-Type": "text/plain; charset=utf-8", **(headers or {})}
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # client_address is an empty string for Unix domain sockets
+        return self.client_address[0] if self.client_address else "local"
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socket, "AF_UNIX"):  # not available on all platforms, e.g. Windows
+
+    class ThreadingUnixHTTPServer(
+        socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+    ):
+        daemon_threads = True
+
+
+def serve(
+    port: Optional[int] = None,
+    unix_socket: Optional[Path] = None,
+    workers: int = 0,
+    queue_size: int = 16,
+    timeout: float = 60,
+    image_paths: List[str] = [],
+) -> None:
+    """Run the render service until interrupted.
+
+    Args:
+        port: TCP port to listen on at localhost.
+        unix_socket: Path of a Unix domain socket to listen on instead of a TCP port.
+        workers: Number of worker processes (0 = number of CPUs).
+        queue_size: Number of requests that may wait for a free worker.
+        timeout: Seconds to wait for a rendering before responding with an error,
+            after which Graphviz is also killed.
+        image_paths: Paths to use when resolving relative image paths in the input.
+    """
+    service = RenderService(
+        workers or os.cpu_count() or 1, queue_size, timeout, image_paths
+    )
+    handler = type(
+        "Handler", (RenderRequestHandler,), {"service": service}
+    )  # bind the service to the handler class
+    if unix_socket:
+        if not hasattr(socket, "AF_UNIX"):
+            raise Exception("Unix domain sockets are not supported on this platform")
+        if Path(unix_socket).is_socket():
+            Path(unix_socket).unlink()  # left behind by a previous service
+        server = ThreadingUnixHTTPServer(str(unix_socket), handler)
+        print(f"{APP_NAME} {__version__} serving at {unix_socket}")
+    else:
+        server = ThreadingHTTPServer((HOST, port), handler)
+        print(f"{APP_NAME} {__version__} serving at http://{HOST}:{port}/render")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if unix_socket:
+            Path(unix_socket).unlink()
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@click.option(
+    "-P",
+    "--port",
+    default=8765,
+    type=int,
+    show_default=True,
+    help="TCP port to listen on at localhost.",
+)
+@click.option(
+    "-u",
+    "--unix-socket",
+    default=None,
+    type=Path,
+    help="Unix domain socket to listen on instead of a TCP port.",
+)
+@click.option(
+    "-j",
+    "--workers",
+    default=0,
+    type=click.IntRange(min=0),
+    help="Number of worker processes (0 = number of CPUs).",
+)
+@click.option(
+    "-q",
+    "--queue-size",
+    default=16,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="Number of requests that may wait for a free worker before rejecting more.",
+)
+@click.option(
+    "-t",
+    "--timeout",
+    default=60,
+    type=float,
+    show_default=True,
+    help="Seconds to wait for a rendering before responding with an error "
+    "(and killing Graphviz).",
+)
+@click.option(
+    "-i",
+    "--image-path",
+    default=[],
+    multiple=True,
+    type=Path,
+    help="Directory to resolve relative image paths in the input from.",
+)
+def main(port, unix_socket, workers, queue_size, timeout, image_path):
+    """
+    Runs a local service that renders WireViz YAML input sent with
+    POST /render?format=<svg|png|tsv|csv|jsonl|html>.
+    """
+    if unix_socket and not hasattr(socket, "AF_UNIX"):
+        raise click.BadParameter(
+            "Unix domain sockets are not supported on this platform",
+            param_hint="--unix-socket",
+        )
+    serve(port, unix_socket, workers, queue_size, timeout, list(image_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from wireviz.Harness import Harness
+from wireviz.wv_html import get_template_file
+
+FileState = Optional[Tuple[int, int]]  # (mtime_ns, size), or None if missing
+
+
+def file_state(path: Path) -> FileState:
+    """Return the modification time and size of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Detect changes of a set of files by polling their modification time and size.
+
+    Polling is used to avoid an extra dependency,
+    and works the same way on all platforms and file systems.
+    """
+
+    def __init__(self):
+        self.states: Dict[Path, FileState] = {}
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        """Start watching the paths that are not watched yet."""
+        for path in paths:
+            if Path(path) not in self.states:
+                self.states[Path(path)] = file_state(path)
+
+    def changed(self) -> Set[Path]:
+        """Return the watched paths that changed since the last call."""
+        changed = set()
+        for path, state in self.states.items():
+            new_state = file_state(path)
+            if new_state != state:
+                self.states[path] = new_state
+                changed.add(path)
+        return changed
+
+
+def harness_dependencies(
+    harness: Harness, filename: Path, output_formats: Tuple[str, ...]
+) -> Dict[Path, str]:
+    """Return the image and template files used to generate the harness outputs.
+
+    Returns:
+        A mapping from the resolved file path to the kind of dependency,
+        "image" or "template".
+    """
+    dependencies = {}
+    for component in [*harness.connectors.values(), *harness.cables.values()]:
+        if component.image:
+            dependencies[Path(component.image.src).resolve()] = "image"
+    if "html" in output_formats:
+        template = get_template_file(filename, harness.metadata)
+        dependencies[Path(template).resolve()] = "template"
+    return dependencies